@@ -0,0 +1,95 @@
+import collections
+import multiprocessing
+import os
+import threading
+import time
+import dictionary
+import engine
+import movegen
+
+# Analiza w tle: osobny proces (bez wspólnego GIL-a z pętlą rysowania) liczy ruchy gracza na ruchu, zanim ten
+# zdecyduje. Każde zadanie ma numer; nowe zadanie zmienia wspólny licznik, co przerywa poprzednie między liniami
+# planszy. Wyniki są w cache po kluczu pozycji (wiersze planszy, posortowany stojak), więc powrót do pozycji
+# (cofnięcie, powtórka) nie wymaga liczenia.
+TOP_MOVES = 5
+CACHE_SIZE = 256
+
+
+def position_key(state):
+    return state.rows, tuple(sorted(state.racks[state.current_player - 1]))
+
+
+def _worker(jobs, results, current, dict_path, board_dim, premium_map):
+    # Niższy priorytet: na słabym procesorze system najpierw obsługuje pętlę rysowania
+    if hasattr(os, "nice"): os.nice(10)
+    dic = dictionary.load(dict_path)
+    board = engine.Board(board_dim)
+    while True:
+        job = jobs.recv()
+        if job is None: return
+        job_id, cells, rack = job
+        if current.value != job_id: continue  # nieaktualne jeszcze przed startem
+        board.cells[:] = cells
+        gen = movegen.MoveGenerator(board, dic, premium_map)
+        t0 = time.perf_counter()
+        moves = gen.generate(rack, lambda: current.value != job_id)
+        if moves is None: continue
+        results.send((job_id, {"count": len(moves), "best": moves[0][0] if moves else 0,
+                               "moves": moves[:TOP_MOVES], "seconds": time.perf_counter() - t0}))
+
+
+class Analyzer:
+    # Stan trzyma wyłącznie wątek gry: wątek nasłuchu tylko przekazuje wynik przez on_result(job_id, wynik),
+    # a gra zapisuje go wywołując store() (w pygame - przez zdarzenie)
+    __slots__ = ("cache", "key", "job_id", "pending", "current", "jobs", "results", "process", "on_result")
+
+    def __init__(self, dic, board_dim, premium_map, on_result):
+        ctx = multiprocessing.get_context("spawn")  # bez kopiowania procesu z zainicjalizowanym SDL
+        self.current = ctx.RawValue("i", 0)
+        jobs_in, self.jobs = ctx.Pipe(duplex=False)
+        self.results, results_out = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(target=_worker, daemon=True,
+                                   args=(jobs_in, results_out, self.current, dic.path, board_dim, premium_map))
+        self.process.start()
+        self.cache = collections.OrderedDict()
+        self.key, self.job_id, self.pending = None, 0, None
+        self.on_result = on_result
+        threading.Thread(target=self._listen, daemon=True).start()
+
+    def request(self, state):
+        # Pozycja gracza na ruchu: wynik z cache albo nowe zadanie (bieżące zostaje przerwane)
+        key = position_key(state)
+        if key == self.key: return
+        self.key = key
+        self.job_id += 1
+        self.current.value = self.job_id
+        if key in self.cache:
+            self.cache.move_to_end(key); self.pending = None; return
+        self.pending = (self.job_id, key)
+        self.jobs.send((self.job_id, b"".join(state.rows), list(key[1])))
+
+    def store(self, job_id, result):
+        if not self.pending or self.pending[0] != job_id: return
+        self.cache[self.pending[1]] = result
+        self.pending = None
+        if len(self.cache) > CACHE_SIZE: self.cache.popitem(last=False)
+
+    def result(self):
+        # Wynik dla ostatnio zleconej pozycji albo None, gdy jeszcze liczony
+        return self.cache.get(self.key)
+
+    def _listen(self):
+        while True:
+            try:
+                job_id, result = self.results.recv()
+            except (EOFError, OSError):
+                return
+            self.on_result(job_id, result)
+
+    def close(self):
+        self.current.value = -1
+        try:
+            self.jobs.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
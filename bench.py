@@ -0,0 +1,225 @@
+import argparse
+import copy
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import calc
+import engine
+import layout
+from letters import LETTERS
+
+# Powtarzalne pomiary: punktacja (calc), wczytywanie planszy (.ods) i rysowanie klatki (SDL dummy) w rozdzielczościach
+# z rozdzielczosc.txt, tak jak w menu gry.
+# Wyniki w JSON; --compare porównuje najlepszą próbę (min_ms, najmniej wrażliwą na szum) albo zajętą
+# pamięć (bytes) z zapisaną bazą i kończy się kodem 1 przy regresji.
+BOARD_SIZES = (15, 25, 50)
+DENSITIES = (0.1, 0.3, 0.6)
+ODS_SIZES = (15, 25, 51, 101)
+SNAPSHOT_COUNT, SNAPSHOT_DIM = 10000, 25
+NAIVE_SAMPLE = 500
+
+
+def measure(fn, repeat=5, min_time=0.02):
+    # Liczba wywołań dobrana tak, by jedna próba trwała co najmniej min_time
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number): fn()
+        if time.perf_counter() - t0 >= min_time or number >= 1 << 20: break
+        number *= 2
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number): fn()
+        samples.append((time.perf_counter() - t0) / number * 1000)
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples), "calls": number}
+
+
+def synthetic_board(dim, density, cross, rng):
+    # Plansza słowników jak w grze + ruch 7 płytek w środkowym wierszu;
+    # cross=False czyści sąsiednie wiersze (jedno słowo), cross=True je zapełnia (wiele słów poprzecznych)
+    letters = list(LETTERS)
+    board = [[{'letter': rng.choice(letters), 'new': False} if rng.random() < density else None
+              for _ in range(dim)] for _ in range(dim)]
+    r, c0 = dim // 2, dim // 2 - 3
+    for c in range(c0 - 1, c0 + 8):
+        if 0 <= c < dim:
+            for rr in (r - 1, r + 1):
+                board[rr][c] = {'letter': rng.choice(letters), 'new': False} if cross else None
+            board[r][c] = None
+    placed = []
+    for c in range(c0, c0 + 7):
+        letter = rng.choice(letters)
+        board[r][c] = {'letter': letter, 'new': True}
+        placed.append((r, c, letter))
+    premium_map = {(rr, cc): layout.premium(rng.choice("SL"), rng.choice((2, 3)))
+                   for rr in range(dim) for cc in range(dim) if rng.random() < 0.3}
+    return board, placed, premium_map
+
+
+def bench_scoring(results):
+    rng = random.Random(1234)
+    for dim in BOARD_SIZES:
+        for density in DENSITIES:
+            for cross in (False, True):
+                board, placed, premium_map = synthetic_board(dim, density, cross, rng)
+                view = calc.board_view(board)
+                r, c, _ = placed[0]
+                name = f"{dim}x{dim}/d{density}/{'cross' if cross else 'single'}"
+                results[f"calc.get_word_at/{name}"] = measure(lambda: calc.get_word_at(board, r, c, (0, 1), dim))
+                results[f"calc.calculate_full_score/{name}"] = measure(
+                    lambda: calc.calculate_full_score(board, premium_map, dim, LETTERS))
+                results[f"calc.calculate_move_score/{name}"] = measure(
+                    lambda: calc.calculate_move_score(view, placed, premium_map, dim, LETTERS))
+
+
+def load_cold(path):
+    if os.path.exists(path + layout.SUFFIX): os.remove(path + layout.SUFFIX)
+    return layout.load_layout(path)
+
+
+def bench_board_loading(results):
+    try:
+        import pandas as pd
+    except ImportError:
+        print("pominięto wczytywanie planszy: brak pandas", file=sys.stderr); return
+    rng = random.Random(99)
+    promos = ["3S", "2S", "3L", "2L"]
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in ODS_SIZES:
+            path = os.path.join(tmp, f"plansza{size}.ods")
+            cells = [[rng.choice(promos) if rng.random() < 0.3 else "" for _ in range(size)] for _ in range(size)]
+            pd.DataFrame(cells).to_excel(path, engine="odf", index=False, header=False)
+            # Zimny start: bez pliku .layout (parsowanie .ods i zapis), ciepły: odczyt skompilowanego pliku
+            results[f"layout.load_layout(cold)/{size}x{size}"] = measure(lambda: load_cold(path), repeat=3, min_time=0)
+            results[f"layout.load_layout(warm)/{size}x{size}"] = measure(lambda: layout.load_layout(path))
+
+
+def bench_rendering(results):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    try:
+        import pygame
+        import main
+    except ImportError:
+        print("pominięto rysowanie: brak pygame", file=sys.stderr); return
+    app = main.ScrabbleGame()
+    app.game_state = "PLAYING"
+    rng = random.Random(7)
+    for _ in range(app.board_dim * 3):
+        r, c = rng.randrange(app.board_dim), rng.randrange(app.board_dim)
+        app.game.board.place(r, c, rng.choice(list(LETTERS)))
+    app.game.board.commit()
+
+    def dirty_frame():
+        # Klatka po zmianie stanu, jak w pętli gry: cała scena i flip
+        app.dirty = True; app.draw()
+
+    def rebuild():
+        # Zmiana rozdzielczości albo zoomu: nowe wymiary, potem scena z odbudową warstwy planszy
+        app.recalculate_dimensions(); app.draw_scene()
+
+    for w, h in app.load_resolutions():
+        res = f"{w}x{h}"
+        app.screen = pygame.display.set_mode((w, h))
+        app.recalculate_dimensions()
+        results[f"render.draw_scene/{res}"] = measure(app.draw_scene)
+        results[f"render.draw(dirty)/{res}"] = measure(dirty_frame)
+        results[f"render.rebuild/{res}"] = measure(rebuild)
+    pygame.quit()
+
+
+def snapshot_chain(count, dim, rng):
+    # Łańcuchy migawek GameState z losowymi ruchami (1-7 płytek w jednym wierszu); po wyczerpaniu
+    # worka albo miejsca nowa partia - jak drzewo przeszukiwania z wieloma gałęziami
+    start = engine.Game(dim, seed=rng.randrange(1 << 30)).state
+    states, state = [], start
+    while len(states) < count:
+        rack = state.racks[state.current_player - 1]
+        r = rng.randrange(dim)
+        free = [c for c, code in enumerate(state.rows[r]) if not code]
+        if not rack or len(free) < len(rack):
+            state = start; continue
+        n = rng.randint(1, len(rack))
+        placed = [(r, c, l) for c, l in zip(sorted(rng.sample(free, n)), rack)]
+        state = state.play(placed, rng.randrange(40))
+        states.append(state)
+    return states
+
+
+def naive_snapshot(state):
+    # Dawna reprezentacja board_state (lista list słowników) kopiowana w całości dla każdej migawki
+    return [[{'letter': state.letter_at(r, c), 'new': False} if code else None for c, code in enumerate(row)]
+            for r, row in enumerate(state.rows)]
+
+
+def bench_snapshots(results):
+    rng = random.Random(11)
+    name = f"{SNAPSHOT_COUNT} x {SNAPSHOT_DIM}x{SNAPSHOT_DIM}"
+    tracemalloc.start()
+    states = snapshot_chain(SNAPSHOT_COUNT, SNAPSHOT_DIM, rng)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    results[f"snapshot.GameState/{name}"] = {"bytes": size, "bytes_per_snapshot": size / len(states)}
+    tracemalloc.start()
+    naive = [naive_snapshot(s) for s in states[-NAIVE_SAMPLE:]]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    per = size / len(naive)
+    results[f"snapshot.board_state/{name}"] = {"bytes": per * SNAPSHOT_COUNT, "bytes_per_snapshot": per,
+                                               "sample": NAIVE_SAMPLE}
+    del naive
+    state = states[-1]
+    rack = state.racks[state.current_player - 1] or ("A",)
+    free = [c for c, code in enumerate(state.rows[0]) if not code][:len(rack)]
+    placed = [(0, c, l) for c, l in zip(free, rack)]
+    board = naive_snapshot(state)
+    results[f"snapshot.GameState.play/{SNAPSHOT_DIM}x{SNAPSHOT_DIM}"] = measure(lambda: state.play(placed, 10))
+    results[f"snapshot.deepcopy/{SNAPSHOT_DIM}x{SNAPSHOT_DIM}"] = measure(lambda: copy.deepcopy(board))
+
+
+def compare(results, baseline, threshold):
+    # Czas: min_ms, pamięć: bytes
+    regressions = []
+    for name, base in baseline["results"].items():
+        cur = results.get(name)
+        key = "min_ms" if "min_ms" in base else "bytes"
+        if cur and key in cur and cur[key] > base[key] * (1 + threshold):
+            regressions.append((name, key, base[key], cur[key]))
+    for name, key, old, new in regressions:
+        unit = "ms" if key == "min_ms" else "B"
+        print(f"REGRESJA {name}: {old:.4f} {unit} -> {new:.4f} {unit} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarki punktacji, wczytywania planszy i rysowania")
+    parser.add_argument("--out", default="bench_wyniki.json")
+    parser.add_argument("--only", choices=["scoring", "loading", "rendering", "snapshots"], action="append")
+    parser.add_argument("--compare", metavar="BASELINE", help="plik JSON z wynikami bazowymi")
+    parser.add_argument("--threshold", type=float, default=0.2, help="dopuszczalny wzrost czasu (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    suites = {"scoring": bench_scoring, "loading": bench_board_loading, "rendering": bench_rendering,
+              "snapshots": bench_snapshots}
+    for name in args.only or suites:
+        suites[name](results)
+    data = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    print(f"Zapisano {len(results)} pomiarów do {args.out}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            if compare(results, json.load(f), args.threshold): return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
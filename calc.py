@@ -54,4 +54,95 @@ def calculate_full_score(board_state, premium_map, board_dim, letters_data):
     if len(new_tiles_pos) == 7:
         total_score += 50
         math_lines.append("BINGO! (+50 pkt)")
-    return total_score, " | ".join(math_lines)
\ No newline at end of file
+    return total_score, " | ".join(math_lines)
+
+
+# --- Punktacja przyrostowa: tylko słowa przechodzące przez położone płytki ---
+
+def board_view(board_state):
+    def letter_at(r, c):
+        tile = board_state[r][c]
+        return tile['letter'] if tile else None
+    return letter_at
+
+def get_word_from(letter_at, new_tiles, r, c, direction, board_dim):
+    dr, dc = direction
+    def at(r, c):
+        return new_tiles.get((r, c)) or letter_at(r, c)
+    start_r, start_c = r, c
+    while 0 <= start_r - dr < board_dim and 0 <= start_c - dc < board_dim and at(start_r - dr, start_c - dc):
+        start_r -= dr
+        start_c -= dc
+    word_tiles = []
+    curr_r, curr_c = start_r, start_c
+    while 0 <= curr_r < board_dim and 0 <= curr_c < board_dim:
+        let = at(curr_r, curr_c)
+        if not let: break
+        word_tiles.append((curr_r, curr_c, let, (curr_r, curr_c) in new_tiles))
+        curr_r += dr
+        curr_c += dc
+    return word_tiles if len(word_tiles) > 1 else []
+
+def find_move_words(letter_at, placed, board_dim):
+    new_tiles = {(r, c): let for r, c, let in placed}
+    detected_words = []
+    found_starts = set()
+    for r, c, _ in sorted(placed):
+        for direction in [(0, 1), (1, 0)]:
+            word = get_word_from(letter_at, new_tiles, r, c, direction, board_dim)
+            if word:
+                key = (word[0][0], word[0][1], direction)
+                if key not in found_starts:
+                    detected_words.append(word)
+                    found_starts.add(key)
+    return detected_words
+
+def calculate_move_score(letter_at, placed, premium_map, board_dim, letters_data):
+    # placed: lista (r, c, litera) płytek położonych w tym ruchu;
+    # letter_at(r, c) zwraca literę z planszy (z płytkami ruchu lub bez nich)
+    if not placed: return 0, ""
+    total_score = 0
+    math_lines = []
+    for word in find_move_words(letter_at, placed, board_dim):
+        word_str = "".join([t[2] for t in word])
+        base_pts = 0
+        word_mult = 1
+        comp_desc, add_desc = [], []
+        for r, c, let, is_new in word:
+            val = letters_data[let][1]
+            curr_val, suffix = val, ""
+            if is_new:
+                prem = premium_map.get((r, c))
+                if prem:
+                    if prem[0] == "L": curr_val = val * prem[1]; suffix = f"x{prem[1]}L"
+                    elif prem[0] == "S": word_mult *= prem[1]; suffix = f"(Słowox{prem[1]})"
+            base_pts += curr_val
+            comp_desc.append(f"{let}{val}{suffix}"); add_desc.append(str(curr_val))
+        f_pts = base_pts * word_mult
+        total_score += f_pts
+        line = f"{word_str} = {', '.join(comp_desc)} = {'+'.join(add_desc)}"
+        if word_mult > 1: line += f" = ({base_pts}) x {word_mult}S = {f_pts}"
+        else: line += f" = {f_pts}"
+        math_lines.append(line)
+    if len(placed) == 7:
+        total_score += 50
+        math_lines.append("BINGO! (+50 pkt)")
+    return total_score, " | ".join(math_lines)
+
+def move_points(letter_at, placed, premium_map, board_dim, letters_data):
+    # Te same zasady co calculate_move_score, bez budowania opisu (ranking ruchów)
+    if not placed: return 0
+    total_score = 0
+    for word in find_move_words(letter_at, placed, board_dim):
+        base_pts, word_mult = 0, 1
+        for r, c, let, is_new in word:
+            val = letters_data[let][1]
+            if is_new:
+                prem = premium_map.get((r, c))
+                if prem:
+                    if prem[0] == "L": val *= prem[1]
+                    elif prem[0] == "S": word_mult *= prem[1]
+            base_pts += val
+        total_score += base_pts * word_mult
+    if len(placed) == 7: total_score += 50
+    return total_score
@@ -0,0 +1,20 @@
+import random
+import pytest
+import dictionary
+
+# Mały słownik testowy: losowe słowa z kilku częstych liter, zbudowany raz na sesję
+WORD_LETTERS = "AEIKOTNRSZ"
+
+
+@pytest.fixture(scope="session")
+def small_dic(tmp_path_factory):
+    rng = random.Random(3)
+    words = set()
+    while len(words) < 3000:
+        words.add("".join(rng.choice(WORD_LETTERS) for _ in range(rng.randint(2, 5))))
+    d = tmp_path_factory.mktemp("dic")
+    (d / "slowa.txt").write_text("\n".join(sorted(words)), encoding="utf-8")
+    dictionary.compile_wordlist(str(d / "slowa.txt"), str(d / "slowa.dawg"))
+    dic = dictionary.load(str(d / "slowa.dawg"))
+    yield dic
+    dic.close()
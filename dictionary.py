@@ -0,0 +1,203 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from letters import CODES
+
+# Plik .dawg: nagłówek + tablica krawędzi uint32 (little-endian).
+# Krawędź: bity 0-5 kod litery, bit 6 koniec słowa, bit 7 ostatnia krawędź węzła,
+# bity 8-31 indeks pierwszej krawędzi dziecka (0 = brak dzieci).
+MAGIC = b"SCRDAWG"
+VERSION = 1
+HEADER = struct.Struct("<7sBII")  # magic, wersja, liczba krawędzi, indeks korzenia
+EOW_BIT = 0x40
+LAST_BIT = 0x80
+CODE_MASK = 0x3F
+MAX_EDGES = 1 << 24
+
+
+class _Node:
+    __slots__ = ("final", "edges")
+
+    def __init__(self):
+        self.final = False
+        self.edges = {}
+
+    def key(self):
+        return (self.final, tuple((c, id(n)) for c, n in sorted(self.edges.items())))
+
+
+def encode_word(word):
+    # Słowo -> krotka kodów liter; None gdy zawiera znak spoza alfabetu gry
+    codes = []
+    for ch in word.strip().upper():
+        code = CODES.get(ch)
+        if code is None: return None
+        codes.append(code)
+    return tuple(codes) if codes else None
+
+
+def build_dawg(words):
+    # Minimalny DAWG metodą przyrostową (Daciuk i in.) - wymaga posortowanego wejścia
+    root = _Node()
+    register = {}
+    unchecked = []
+    prev = ()
+
+    def minimize(down_to):
+        while len(unchecked) > down_to:
+            parent, code, child = unchecked.pop()
+            k = child.key()
+            if k in register: parent.edges[code] = register[k]
+            else: register[k] = child
+
+    for word in words:
+        if word == prev: continue
+        common = 0
+        while common < min(len(word), len(prev)) and word[common] == prev[common]:
+            common += 1
+        minimize(common)
+        node = unchecked[-1][2] if unchecked else root
+        for code in word[common:]:
+            child = _Node()
+            node.edges[code] = child
+            unchecked.append((node, code, child))
+            node = child
+        node.final = True
+        prev = word
+    minimize(0)
+    return root
+
+
+def serialize(root):
+    # Każdy węzeł z dziećmi dostaje ciągły blok krawędzi; indeks 0 jest zarezerwowany
+    offsets = {}
+    order = []
+    next_free = 1
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if id(node) in offsets or not node.edges: continue
+        offsets[id(node)] = next_free
+        next_free += len(node.edges)
+        order.append(node)
+        stack.extend(node.edges.values())
+    if next_free >= MAX_EDGES: raise ValueError(f"Słownik za duży: {next_free} krawędzi")
+    edges = array("I", [0]) * next_free
+    for node in order:
+        i = offsets[id(node)]
+        items = sorted(node.edges.items())
+        for n, (code, child) in enumerate(items):
+            e = code | (offsets.get(id(child), 0) << 8)
+            if child.final: e |= EOW_BIT
+            if n == len(items) - 1: e |= LAST_BIT
+            edges[i + n] = e
+    return edges, offsets.get(id(root), 0)
+
+
+def compile_wordlist(src, dst):
+    skipped = 0
+    words = []
+    with open(src, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip(): continue
+            w = encode_word(line)
+            if w is None: skipped += 1
+            else: words.append(w)
+    words.sort()
+    edges, root = serialize(build_dawg(words))
+    if sys.byteorder != "little": edges.byteswap()
+    with open(dst, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(edges), root))
+        edges.tofile(f)
+    return len(words), skipped, len(edges)
+
+
+class Dictionary:
+    # Słownik tylko do odczytu, mapowany z pliku .dawg - bez wczytywania słów do pamięci
+    __slots__ = ("path", "_file", "_mm", "_edges", "_root")
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = None
+        try:
+            # Pusty plik (mmap), za krótki nagłówek, inna wersja albo ucięte krawędzie - zawsze ValueError
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(self._mm) < HEADER.size: raise ValueError
+            magic, version, count, self._root = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != VERSION or len(self._mm) != HEADER.size + count * 4: raise ValueError
+        except ValueError:
+            if self._mm is not None: self._mm.close()
+            self._file.close()
+            raise ValueError(f"Nieobsługiwany albo uszkodzony plik słownika: {path}") from None
+        if sys.byteorder == "little":
+            self._edges = memoryview(self._mm)[HEADER.size:HEADER.size + count * 4].cast("I")
+        else:
+            self._edges = array("I", self._mm[HEADER.size:HEADER.size + count * 4]); self._edges.byteswap()
+
+    def __contains__(self, word):
+        edges, node, eow = self._edges, self._root, 0
+        for ch in word:
+            code = CODES.get(ch)
+            if code is None or not node: return False
+            while True:
+                e = edges[node]
+                if e & CODE_MASK == code: break
+                if e & LAST_BIT: return False
+                node += 1
+            eow = e & EOW_BIT
+            node = e >> 8
+        return bool(eow)
+
+    # Przechodzenie po DAWG (generator ruchów): węzeł = indeks pierwszej krawędzi,
+    # krawędź = uint32 (kod litery | koniec słowa | indeks dziecka << 8)
+    @property
+    def root(self):
+        return self._root
+
+    @property
+    def edges(self):
+        return self._edges
+
+    def step(self, node, code):
+        edges = self._edges
+        while node:
+            e = edges[node]
+            if e & CODE_MASK == code: return e
+            if e & LAST_BIT: return 0
+            node += 1
+        return 0
+
+    def children(self, node):
+        edges = self._edges
+        while node:
+            e = edges[node]
+            yield e
+            if e & LAST_BIT: return
+            node += 1
+
+    def close(self):
+        if isinstance(self._edges, memoryview): self._edges.release()
+        self._mm.close()
+        self._file.close()
+
+
+def load(path="slowa.dawg"):
+    if not os.path.exists(path): return None
+    try:
+        return Dictionary(path)
+    except (OSError, ValueError) as e:
+        print(f"Błąd ładowania słownika {path}: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kompilacja listy słów do pliku .dawg")
+    parser.add_argument("wordlist", help="plik tekstowy UTF-8, jedno słowo w linii")
+    parser.add_argument("output", nargs="?", default="slowa.dawg")
+    args = parser.parse_args()
+    n, skipped, n_edges = compile_wordlist(args.wordlist, args.output)
+    print(f"Zapisano {args.output}: {n} słów, {n_edges} krawędzi, pominięto {skipped}")
@@ -0,0 +1,319 @@
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+from array import array
+import dictionary
+import engine
+import movegen
+import record
+from letters import LETTERS, ALPHABET, CODES
+
+# Dokładne rozwiązywanie końcówki: przy pustym worku oba stojaki są znane, więc negamax z cięciami alfa-beta
+# przegląda wszystkie ruchy do końca partii. Wartość = zysk różnicy punktów gracza na ruchu; liście liczone
+# jak engine.Game.end_game (każdy traci wartość liter ze swojego stojaka). Partia kończy się wyłożeniem
+# ostatniej płytki albo dwoma pasami z rzędu.
+INF = 1 << 30
+EXACT, LOWER, UPPER = 0, 1, 2
+TT_ENTRY_BYTES = 16        # klucz Q + wartość i + meta I
+ZOBRIST_SEED = 20240601
+PASS = (0, None)
+PENALTY = {l: v for l, (_, v) in LETTERS.items()}
+
+
+class TranspositionTable:
+    # Stała liczba wpisów (potęga dwójki) w tablicach array - zużycie pamięci nie rośnie w trakcie przeszukiwania.
+    # meta = rodzaj wartości | log2(liczby węzłów poddrzewa) << 2 | (najlepszy ruch + 1) << 8.
+    # Przy kolizji nowy wpis wypiera stary, gdy jego poddrzewo nie było mniejsze (albo to ta sama pozycja).
+    __slots__ = ("mask", "keys", "values", "meta", "stores", "evictions")
+
+    def __init__(self, memory_mb=64):
+        size = 1
+        while size * 2 * TT_ENTRY_BYTES <= memory_mb << 20: size *= 2
+        self.mask = size - 1
+        self.keys = array("Q", bytes(8 * size))
+        self.values = array("i", bytes(4 * size))
+        self.meta = array("I", bytes(4 * size))
+        self.stores = self.evictions = 0
+
+    def __len__(self):
+        return self.mask + 1
+
+    def probe(self, key):
+        i = key & self.mask
+        if self.keys[i] != key: return None
+        m = self.meta[i]
+        return self.values[i], m & 3, (m >> 8) - 1
+
+    def store(self, key, value, flag, best, work):
+        i = key & self.mask
+        work = min(work.bit_length(), 63)
+        old = self.keys[i]
+        if old and old != key:
+            if (self.meta[i] >> 2) & 63 > work: return
+            self.evictions += 1
+        self.keys[i], self.values[i], self.meta[i] = key, value, flag | work << 2 | (best + 1) << 8
+        self.stores += 1
+
+
+class EndgameSolver:
+    # Przeszukuje prywatną kopię planszy: ruch zmienia tylko bajty planszy i wpisy cross-check generatora,
+    # cofnięcie przywraca oba (MoveGenerator.update/restore), a skrót Zobrista jest aktualizowany przyrostowo.
+    __slots__ = ("board", "movegen", "racks", "side", "scores", "tt", "memory_mb", "nodes", "best_index", "hash",
+                 "z_square", "z_rack", "z_side", "z_pass", "dictionary", "premium_map")
+
+    def __init__(self, game, memory_mb=64):
+        if game.bag: raise ValueError("Worek nie jest pusty - końcówkę można rozwiązać dopiero przy pustym worku")
+        if game.finished or not (game.racks[1] and game.racks[2]): raise ValueError("Partia jest już zakończona")
+        game = game.copy()
+        game.return_tiles()
+        dim = game.board_dim
+        self.board = game.board
+        self.dictionary, self.premium_map = game.dictionary, game.premium_map
+        self.movegen = movegen.MoveGenerator(self.board, game.dictionary, game.premium_map)
+        self.racks = {1: game.racks[1][:], 2: game.racks[2][:]}
+        self.side = game.current_player
+        self.scores = dict(game.scores)
+        self.tt, self.memory_mb = TranspositionTable(memory_mb), memory_mb
+        self.nodes, self.best_index = 0, 0
+        n_codes = len(ALPHABET) + 1
+        rng = random.Random(ZOBRIST_SEED)
+        self.z_square = array("Q", rng.randbytes(8 * dim * dim * n_codes))
+        self.z_rack = {p: array("Q", rng.randbytes(8 * n_codes * (engine.RACK_SIZE + 1))) for p in (1, 2)}
+        for p in (1, 2):
+            for code in range(n_codes): self.z_rack[p][code * (engine.RACK_SIZE + 1)] = 0  # brak litery
+        self.z_side, self.z_pass = rng.getrandbits(64), rng.getrandbits(64)
+        h = self.z_side if self.side == 2 else 0
+        for i, code in enumerate(self.board.cells):
+            if code: h ^= self.z_square[i * n_codes + code]
+        for p in (1, 2):
+            for l in set(self.racks[p]):
+                h ^= self.z_rack[p][CODES[l] * (engine.RACK_SIZE + 1) + self.racks[p].count(l)]
+        self.hash = h
+
+    def state(self):
+        # Opis pozycji do odtworzenia solvera w innym procesie
+        return (self.board.dim, self.premium_map, self.dictionary.path, bytes(self.board.cells),
+                self.racks, self.side, self.scores)
+
+    @classmethod
+    def from_state(cls, state, memory_mb=64):
+        dim, premium_map, dict_path, cells, racks, side, scores = state
+        game = engine.Game(dim, premium_map, dictionary.load(dict_path))
+        for i, code in enumerate(cells):
+            if code: game.board.place(i // dim, i % dim, ALPHABET[code - 1])
+        game.board.commit()
+        game.bag, game.racks, game.current_player, game.scores = [], {1: racks[1][:], 2: racks[2][:]}, side, dict(scores)
+        return cls(game, memory_mb)
+
+    def penalty(self, p):
+        return sum(PENALTY[l] for l in self.racks[p])
+
+    def moves(self):
+        # Ruchy wykładające cały stojak najpierw (kończą partię), dalej malejąco po punktach; pas na końcu
+        rack = self.racks[self.side]
+        moves = self.movegen.generate(rack)
+        moves.sort(key=lambda m: len(m[1]) < len(rack))
+        moves.append(PASS)
+        return moves
+
+    def make(self, placed):
+        side, rack, cells, dim = self.side, self.racks[self.side], self.board.cells, self.board.dim
+        n_codes, stride = len(ALPHABET) + 1, engine.RACK_SIZE + 1
+        z_rack, h = self.z_rack[side], self.hash
+        for r, c, l in placed:
+            code = CODES[l]
+            cells[r * dim + c] = code
+            h ^= self.z_square[(r * dim + c) * n_codes + code]
+            n = rack.count(l)
+            h ^= z_rack[code * stride + n] ^ z_rack[code * stride + n - 1]
+            rack.remove(l)
+        self.hash = h ^ self.z_side
+        self.side = 3 - side
+        return self.movegen.update(placed)
+
+    def unmake(self, placed, saved):
+        self.side = side = 3 - self.side
+        rack, cells, dim = self.racks[side], self.board.cells, self.board.dim
+        n_codes, stride = len(ALPHABET) + 1, engine.RACK_SIZE + 1
+        z_rack, h = self.z_rack[side], self.hash ^ self.z_side
+        for r, c, l in reversed(placed):
+            code = CODES[l]
+            cells[r * dim + c] = 0
+            h ^= self.z_square[(r * dim + c) * n_codes + code]
+            n = rack.count(l)
+            h ^= z_rack[code * stride + n] ^ z_rack[code * stride + n + 1]
+            rack.append(l)
+        self.hash = h
+        self.movegen.restore(saved)
+
+    def pass_turn(self):
+        self.side = 3 - self.side
+        self.hash ^= self.z_side
+
+    def search(self, alpha, beta, passed=False):
+        self.nodes += 1
+        key = (self.hash ^ self.z_pass if passed else self.hash) or 1
+        alpha0, best_idx = alpha, -1
+        entry = self.tt.probe(key)
+        if entry:
+            v, flag, best_idx = entry
+            if flag == EXACT:
+                self.best_index = best_idx; return v
+            if flag == LOWER and v >= beta: return v
+            if flag == UPPER and v <= alpha: return v
+        moves = self.moves()
+        order = range(len(moves))
+        if 0 < best_idx < len(moves): order = [best_idx] + [i for i in order if i != best_idx]
+        side, nodes0 = self.side, self.nodes
+        best, best_i = -INF, 0
+        for i in order:
+            pts, placed = moves[i]
+            if placed is None:
+                if passed: v = self.penalty(3 - side) - self.penalty(side)
+                else:
+                    self.pass_turn()
+                    v = -self.search(-beta, -alpha, True)
+                    self.pass_turn()
+            else:
+                saved = self.make(placed)
+                if not self.racks[side]: v = pts + self.penalty(3 - side)
+                else: v = pts - self.search(pts - beta, pts - alpha)
+                self.unmake(placed, saved)
+            if v > best: best, best_i = v, i
+            if v > alpha: alpha = v
+            if alpha >= beta: break
+        flag = UPPER if best <= alpha0 else (LOWER if best >= beta else EXACT)
+        self.tt.store(key, best, flag, best_i, self.nodes - nodes0)
+        self.best_index = best_i
+        return best
+
+    def principal_variation(self, passed=False):
+        # Optymalna sekwencja od bieżącej pozycji: [(gracz, punkty, płytki lub None dla pasa)]
+        line, undo = [], []
+        while True:
+            self.search(-INF, INF, passed)
+            pts, placed = self.moves()[self.best_index]
+            line.append((self.side, pts, placed))
+            if placed is None:
+                if passed: break
+                self.pass_turn(); undo.append(None); passed = True
+            else:
+                side = self.side
+                undo.append((placed, self.make(placed))); passed = False
+                if not self.racks[side]: break
+        for step in reversed(undo):
+            if step is None: self.pass_turn()
+            else: self.unmake(*step)
+        return line
+
+    def solve(self, workers=1):
+        # Zwraca słownik: value (zysk różnicy gracza na ruchu), spread (końcowa różnica punktów),
+        # sequence, final_scores, nodes, seconds, nodes_per_s
+        t0 = time.perf_counter()
+        nodes0 = self.nodes
+        if workers > 1:
+            value, sequence, nodes = self._solve_parallel(workers)
+        else:
+            value = self.search(-INF, INF)
+            sequence, nodes = self.principal_variation(), 0
+        seconds = time.perf_counter() - t0
+        nodes += self.nodes - nodes0
+        final, racks = dict(self.scores), {1: self.racks[1][:], 2: self.racks[2][:]}
+        for p, pts, placed in sequence:
+            final[p] += pts
+            for _, _, l in placed or (): racks[p].remove(l)
+        for p in (1, 2): final[p] -= sum(PENALTY[l] for l in racks[p])
+        side = self.side
+        return {"player": side, "value": value, "spread": final[side] - final[3 - side],
+                "sequence": sequence, "final_scores": final, "nodes": nodes,
+                "seconds": seconds, "nodes_per_s": nodes / seconds if seconds else 0.0}
+
+    def _solve_parallel(self, workers):
+        # Ruchy korzenia rozdzielone między procesy; najlepsza dotąd wartość (wspólna) zawęża okno kolejnych
+        moves = self.moves()
+        best = multiprocessing.Value("i", -INF)
+        with multiprocessing.Pool(workers, initializer=_init_worker,
+                                  initargs=(self.state(), self.memory_mb, best)) as pool:
+            results = list(pool.imap_unordered(_solve_root_move, range(len(moves))))
+        nodes = sum(r[3] for r in results)
+        exact = [r for r in results if r[2]]
+        _, value, _, _, line = max(exact, key=lambda r: (r[1], -r[0]))
+        return value, line, nodes
+
+
+_worker = {}
+
+
+def _init_worker(state, memory_mb, best):
+    _worker["solver"] = EndgameSolver.from_state(state, memory_mb)
+    _worker["best"] = best
+
+
+def _solve_root_move(idx):
+    # Zwraca (indeks, wartość, czy dokładna, węzły, sekwencja); wartość niedokładna jest tylko górnym
+    # ograniczeniem, gdy ruch nie poprawia wyniku znalezionego już przez inny proces
+    solver, best = _worker["solver"], _worker["best"]
+    nodes0 = solver.nodes
+    side = solver.side
+    pts, placed = solver.moves()[idx]
+    alpha = best.value
+    line = None
+    if placed is None:
+        solver.pass_turn()
+        v = -solver.search(-INF, -alpha, True)
+        if v > alpha: line = [(side, 0, None)] + solver.principal_variation(True)
+        solver.pass_turn()
+    else:
+        saved = solver.make(placed)
+        if not solver.racks[side]:
+            v = pts + solver.penalty(3 - side)
+            line = [(side, pts, placed)]
+        else:
+            v = pts - solver.search(-INF, pts - alpha)
+            if v > alpha: line = [(side, pts, placed)] + solver.principal_variation()
+        solver.unmake(placed, saved)
+    exact = line is not None
+    if exact:
+        with best.get_lock():
+            if v > best.value: best.value = v
+    return idx, v, exact, solver.nodes - nodes0, line
+
+
+def policy(game, moves, rng):
+    # Polityka dla simulate.py (--policy endgame:policy): najlepszy ruch, a przy pustym worku ruch z rozwiązania
+    if game.bag: return moves[0]
+    _, pts, placed = EndgameSolver(game, memory_mb=16).solve()["sequence"][0]
+    return (pts, placed) if placed else None
+
+
+def describe(placed):
+    if placed is None: return "pas"
+    return " ".join(f"{l}({r},{c})" for r, c, l in placed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dokładne rozwiązanie końcówki partii z zapisu .scrrec")
+    parser.add_argument("file")
+    parser.add_argument("--ruch", type=int, help="pozycja po akcji N (domyślnie ostatnia)")
+    parser.add_argument("--slownik", default="slowa.dawg")
+    parser.add_argument("--procesy", type=int, default=1, help="podział ruchów korzenia między procesy")
+    parser.add_argument("--pamiec", type=int, default=64, help="limit tablicy transpozycji w MB (na proces)")
+    args = parser.parse_args()
+    game, info, n = record.load(args.file, args.ruch)
+    game.dictionary = dictionary.load(args.slownik)
+    if not game.dictionary: sys.exit(f"Brak słownika {args.slownik}")
+    try:
+        solver = EndgameSolver(game, args.pamiec)
+    except ValueError as e:
+        sys.exit(str(e))
+    res = solver.solve(args.procesy)
+    names = info["names"]
+    for p, pts, placed in res["sequence"]:
+        print(f"{names[p]}: {describe(placed)} +{pts}")
+    f = res["final_scores"]
+    print(f"Wynik: {names[1]} {f[1]} - {f[2]} {names[2]}; zysk {names[res['player']]}: {res['value']:+d}, "
+          f"różnica końcowa {res['spread']:+d}")
+    print(f"Węzły: {res['nodes']} w {res['seconds']:.2f} s ({res['nodes_per_s']:.0f}/s), "
+          f"tablica transpozycji: {len(solver.tt)} wpisów, zapisów {solver.tt.stores}, wyparć {solver.tt.evictions}")
@@ -0,0 +1,338 @@
+import random
+import calc
+import dictionary
+import layout
+import movegen
+from letters import LETTERS, ALPHABET, CODES
+
+# Silnik gry bez pygame/pandas - zasady, worek, stojaki, punkty i plansza.
+RACK_SIZE = 7
+MAX_SCORELESS_TURNS = 6    # tyle tur z rzędu bez punktów (wymiany, pasy) kończy partię
+MAX_TURNS = 500            # limit tur w grach komputer-komputer
+
+
+def load_setup(layout_path, dict_path):
+    # (board_dim, premium_map, słownik) dla gier bez okna: symulacja, tabela zostawek, serwer, test obciążenia.
+    # Bez pliku planszy 15x15 bez premii, bez słownika None
+    loaded = layout.load_layout(layout_path) if layout_path else None
+    board_dim, premium_map = loaded or (15, {})
+    return board_dim, premium_map, dictionary.load(dict_path)
+
+
+class Board:
+    # Plansza jako bytearray kodów liter (0 = puste) + bitset płytek z bieżącego ruchu.
+    # rows[r] / cols[c] to maski zajętości wiersza / kolumny (także płytek bieżącego ruchu),
+    # count - liczba zatwierdzonych płytek.
+    __slots__ = ("dim", "cells", "new", "rows", "cols", "count")
+
+    def __init__(self, dim, cells=None, new=0, rows=None, cols=None, count=0):
+        self.dim = dim
+        self.cells = cells if cells is not None else bytearray(dim * dim)
+        self.new = new
+        self.rows = rows if rows is not None else [0] * dim
+        self.cols = cols if cols is not None else [0] * dim
+        self.count = count
+
+    @classmethod
+    def from_cells(cls, dim, cells):
+        # Plansza z gotowych kodów (same zatwierdzone płytki)
+        board = cls(dim, bytearray(cells))
+        for i, code in enumerate(board.cells):
+            if code:
+                r, c = divmod(i, dim)
+                board.rows[r] |= 1 << c; board.cols[c] |= 1 << r; board.count += 1
+        return board
+
+    def copy(self):
+        return Board(self.dim, bytearray(self.cells), self.new, self.rows[:], self.cols[:], self.count)
+
+    def letter_at(self, r, c):
+        code = self.cells[r * self.dim + c]
+        return ALPHABET[code - 1] if code else None
+
+    def is_new(self, r, c):
+        return (self.new >> (r * self.dim + c)) & 1
+
+    def is_old(self, r, c):
+        return 0 <= r < self.dim and 0 <= c < self.dim and (self.rows[r] >> c) & 1 and not self.is_new(r, c)
+
+    def is_empty(self):
+        return not any(self.cells)
+
+    def place(self, r, c, letter):
+        i = r * self.dim + c
+        self.cells[i] = CODES[letter]
+        self.new |= 1 << i
+        self.rows[r] |= 1 << c
+        self.cols[c] |= 1 << r
+
+    def remove(self, r, c):
+        i = r * self.dim + c
+        letter = ALPHABET[self.cells[i] - 1]
+        self.cells[i] = 0
+        self.new &= ~(1 << i)
+        self.rows[r] &= ~(1 << c)
+        self.cols[c] &= ~(1 << r)
+        return letter
+
+    def commit(self):
+        self.count += bin(self.new).count("1")
+        self.new = 0
+
+
+class GameState:
+    # Niezmienna migawka stanu partii po zakończonej akcji (cofanie, analiza "co jeśli").
+    # Plansza to krotka wierszy bytes: kolejny stan kopiuje tylko wiersze z nowymi płytkami, resztę współdzieli.
+    # Worek jest zawsze ciągnięty od końca, więc stany współdzielą krotkę i różnią się tylko bag_size.
+    # racks i scores to pary (gracz 1, gracz 2); scoreless - tury z rzędu bez punktów.
+    __slots__ = ("dim", "rows", "racks", "bag", "bag_size", "scores", "current_player", "finished", "rng_state",
+                 "scoreless")
+
+    def __init__(self, dim, rows, racks, bag, bag_size, scores, current_player, finished, rng_state, scoreless=0):
+        self.dim, self.rows, self.racks, self.bag, self.bag_size = dim, rows, racks, bag, bag_size
+        self.scores, self.current_player, self.finished, self.rng_state = scores, current_player, finished, rng_state
+        self.scoreless = scoreless
+
+    @classmethod
+    def capture(cls, game):
+        # Pełny odczyt gry (start partii, wczytanie zapisu) - koszt zależy od wielkości planszy
+        dim, cells = game.board_dim, game.board.cells
+        return cls(dim, tuple(bytes(cells[r * dim:(r + 1) * dim]) for r in range(dim)),
+                   (tuple(game.racks[1]), tuple(game.racks[2])), tuple(game.bag), len(game.bag),
+                   (game.scores[1], game.scores[2]), game.current_player, game.finished, game.rng.getstate(),
+                   game.scoreless)
+
+    def after(self, game, placed=(), reshuffled=False):
+        # Stan gry po akcji, która położyła `placed`; reshuffled - worek był tasowany (wymiana)
+        rows = self.rows
+        if placed:
+            dim, cells, rows = self.dim, game.board.cells, list(rows)
+            for r in {t[0] for t in placed}: rows[r] = bytes(cells[r * dim:(r + 1) * dim])
+            rows = tuple(rows)
+        bag, rng_state = (tuple(game.bag), game.rng.getstate()) if reshuffled else (self.bag, self.rng_state)
+        return GameState(self.dim, rows, (tuple(game.racks[1]), tuple(game.racks[2])), bag, len(game.bag),
+                         (game.scores[1], game.scores[2]), game.current_player, game.finished, rng_state, game.scoreless)
+
+    def letter_at(self, r, c):
+        code = self.rows[r][c]
+        return ALPHABET[code - 1] if code else None
+
+    def play(self, placed, points):
+        # Nowy stan po ruchu bieżącego gracza, bez sprawdzania poprawności (ruchy z generatora, analiza)
+        p = self.current_player
+        rows, by_row = list(self.rows), {}
+        for r, c, l in placed: by_row.setdefault(r, []).append((c, CODES[l]))
+        for r, tiles in by_row.items():
+            row = bytearray(rows[r])
+            for c, code in tiles: row[c] = code
+            rows[r] = bytes(row)
+        rack = list(self.racks[p - 1])
+        for _, _, l in placed: rack.remove(l)
+        n = min(RACK_SIZE - len(rack), self.bag_size)
+        rack.extend(reversed(self.bag[self.bag_size - n:self.bag_size]))
+        racks = (tuple(rack), self.racks[1]) if p == 1 else (self.racks[0], tuple(rack))
+        scores = (self.scores[0] + points, self.scores[1]) if p == 1 else (self.scores[0], self.scores[1] + points)
+        return GameState(self.dim, tuple(rows), racks, self.bag, self.bag_size - n, scores, 3 - p, False, self.rng_state, 0)
+
+    def pass_turn(self):
+        return GameState(self.dim, self.rows, self.racks, self.bag, self.bag_size, self.scores,
+                         3 - self.current_player, self.finished, self.rng_state, self.scoreless + 1)
+
+
+class Game:
+    __slots__ = ("board_dim", "premium_map", "dictionary", "seed", "rng", "board",
+                 "bag", "racks", "scores", "current_player", "placed", "finished", "scoreless", "movegen", "recorder",
+                 "state")
+
+    def __init__(self, board_dim=15, premium_map=None, dictionary=None, seed=None):
+        self.board_dim = board_dim
+        self.premium_map = premium_map if premium_map is not None else {}
+        self.dictionary = dictionary
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self.rng = random.Random(self.seed)
+        self.board = Board(self.board_dim)
+        self.bag = [l for l, (count, _) in LETTERS.items() for _ in range(count)]
+        self.rng.shuffle(self.bag)
+        self.racks = {1: self.draw_tiles(RACK_SIZE), 2: self.draw_tiles(RACK_SIZE)}
+        self.scores = {1: 0, 2: 0}
+        self.current_player = 1
+        self.placed = []
+        self.finished, self.scoreless = False, 0
+        self.movegen = None
+        self.recorder = None
+        self.state = GameState.capture(self)
+
+    def copy(self):
+        g = Game.__new__(Game)
+        g.board_dim, g.premium_map, g.dictionary, g.seed = self.board_dim, self.premium_map, self.dictionary, self.seed
+        g.rng = random.Random(); g.rng.setstate(self.rng.getstate())
+        g.board = self.board.copy()
+        g.bag = self.bag[:]
+        g.racks = {1: self.racks[1][:], 2: self.racks[2][:]}
+        g.scores = dict(self.scores)
+        g.current_player, g.placed, g.finished, g.scoreless = self.current_player, self.placed[:], self.finished, self.scoreless
+        g.movegen = g.recorder = None
+        g.state = self.state
+        return g
+
+    def restore(self, state):
+        # Powrót do migawki (cofnij/ponów): plansza odbudowana z wierszy, cache generatora ruchów od nowa
+        self.board = Board.from_cells(self.board_dim, b"".join(state.rows))
+        self.racks = {1: list(state.racks[0]), 2: list(state.racks[1])}
+        self.bag = list(state.bag[:state.bag_size])
+        self.scores = {1: state.scores[0], 2: state.scores[1]}
+        self.current_player, self.finished, self.scoreless = state.current_player, state.finished, state.scoreless
+        self.rng.setstate(state.rng_state)
+        self.placed, self.movegen, self.state = [], None, state
+        if self.recorder: self.recorder.restore()
+
+    @property
+    def rack(self):
+        return self.racks[self.current_player]
+
+    def draw_tiles(self, n):
+        tiles = []
+        for _ in range(min(n, len(self.bag))):
+            tiles.append(self.bag.pop())
+        return tiles
+
+    def next_turn(self):
+        self.current_player = 2 if self.current_player == 1 else 1
+
+    def take_from_rack(self, idx):
+        return self.rack.pop(idx)
+
+    def return_to_rack(self, letter):
+        self.rack.append(letter)
+
+    def place(self, r, c, letter):
+        if self.board.letter_at(r, c): return False
+        self.board.place(r, c, letter)
+        self.placed.append((r, c, letter))
+        return True
+
+    def pick_up(self, r, c):
+        if not self.board.is_new(r, c): return None
+        letter = self.board.remove(r, c)
+        self.placed = [t for t in self.placed if (t[0], t[1]) != (r, c)]
+        self.rack.append(letter)
+        return letter
+
+    def return_tiles(self):
+        for r, c, l in self.placed:
+            self.board.remove(r, c)
+            self.rack.append(l)
+        self.placed = []
+
+    def move_words(self):
+        return calc.find_move_words(self.board.letter_at, self.placed, self.board_dim)
+
+    def score_move(self):
+        return calc.calculate_move_score(self.board.letter_at, self.placed, self.premium_map, self.board_dim, LETTERS)
+
+    def check_placement(self):
+        # Zwraca None dla poprawnego ułożenia albo powód odrzucenia; koszt zależy od liczby płytek, nie od planszy
+        placed, board = self.placed, self.board
+        if not placed: return None
+        rows, cols = {t[0] for t in placed}, {t[1] for t in placed}
+        if len(rows) > 1 and len(cols) > 1: return "Litery muszą leżeć w jednym wierszu lub kolumnie"
+        if len(rows) == 1: lo, hi, line = min(cols), max(cols), board.rows[placed[0][0]]
+        else: lo, hi, line = min(rows), max(rows), board.cols[placed[0][1]]
+        span = ((1 << (hi - lo + 1)) - 1) << lo
+        if line & span != span: return "Litery muszą tworzyć ciągłe słowo (bez przerw)"
+        if not board.count:
+            centre = self.board_dim // 2
+            if not board.is_new(centre, centre): return "Pierwszy ruch musi przechodzić przez środek planszy"
+            return None
+        if hi - lo + 1 > len(placed): return None
+        for r, c, _ in placed:
+            if board.is_old(r - 1, c) or board.is_old(r + 1, c) or board.is_old(r, c - 1) or board.is_old(r, c + 1): return None
+        return "Słowo musi łączyć się z literami na planszy"
+
+    def confirm_move(self):
+        # Zwraca (przyjęty, tekst); ruch bez płytek to pas. Partia kończy się sama (end_game) po wyłożeniu ostatniej
+        # płytki przy pustym worku albo po MAX_SCORELESS_TURNS turach z rzędu bez punktów - wywołujący czytają finished
+        if self.finished: return False, "Partia jest zakończona"
+        if not self.placed:
+            self.next_turn()
+            self.scoreless += 1
+            self.state = self.state.after(self)
+            if self.recorder: self.recorder.pass_turn()
+            if self.scoreless >= MAX_SCORELESS_TURNS: self.end_game()
+            return True, ""
+        reason = self.check_placement()
+        if reason: return False, reason
+        if self.dictionary:
+            for word in self.move_words():
+                word_str = "".join(t[2] for t in word)
+                if word_str not in self.dictionary: return False, f"Brak w słowniku: {word_str}"
+        pts, math = self.score_move()
+        if pts <= 0: return False, ""
+        self.scores[self.current_player] += pts
+        self.board.commit()
+        if self.movegen: self.movegen.update(self.placed)
+        placed, self.placed = self.placed, []
+        self.rack.extend(self.draw_tiles(RACK_SIZE - len(self.rack)))
+        out = not self.rack
+        self.next_turn()
+        self.scoreless = 0
+        # Migawka i rejestrator po zakończeniu akcji - z uzupełnionym stojakiem i kolejnym graczem
+        self.state = self.state.after(self, placed)
+        if self.recorder: self.recorder.place(placed, pts)
+        if out: self.end_game()
+        return True, math
+
+    def moves(self):
+        # Legalne ruchy bieżącego gracza (punkty, płytki) od najlepszego; wymaga słownika
+        self.return_tiles()
+        if self.movegen is None:
+            self.movegen = movegen.MoveGenerator(self.board, self.dictionary, self.premium_map)
+        return self.movegen.generate(self.rack)
+
+    def best_move(self):
+        moves = self.moves()
+        return moves[0] if moves else None
+
+    def lay(self, placed):
+        # Kładzie płytki (r, c, litera) ze stojaka bieżącego gracza, bez zatwierdzania
+        self.return_tiles()
+        for r, c, l in placed:
+            self.rack.remove(l)
+            self.place(r, c, l)
+
+    def play(self, placed):
+        self.lay(placed)
+        ok, text = self.confirm_move()
+        if not ok: self.return_tiles()
+        return ok, text
+
+    def exchange(self, indices):
+        if self.finished or len(self.bag) < RACK_SIZE: return False
+        indices = sorted(indices, reverse=True)
+        for i in indices:
+            self.bag.append(self.rack.pop(i))
+        self.rng.shuffle(self.bag)
+        self.rack.extend(self.draw_tiles(RACK_SIZE - len(self.rack)))
+        self.next_turn()
+        self.scoreless += 1
+        self.state = self.state.after(self, reshuffled=True)
+        if self.recorder: self.recorder.exchange(indices)
+        if self.scoreless >= MAX_SCORELESS_TURNS: self.end_game()
+        return True
+
+    def rack_penalty(self, p):
+        return sum(LETTERS[l][1] for l in self.racks[p])
+
+    def end_game(self):
+        # Odejmuje wartość liter na stojakach (tylko raz - zakończona partia się nie zmienia); zwraca zwycięzcę (0 = remis)
+        if not self.finished:
+            penalties = {p: self.rack_penalty(p) for p in [1, 2]}
+            for p in [1, 2]: self.scores[p] -= penalties[p]
+            self.finished = True
+            self.state = self.state.after(self)
+            if self.recorder: self.recorder.end(penalties)
+        s1, s2 = self.scores[1], self.scores[2]
+        return 1 if s1 > s2 else (2 if s2 > s1 else 0)
@@ -1,32 +1,96 @@
-import pandas as pd
-import random
-
-def generate_test_board():
-    size = 25
-    # Tworzymy pustą macierz
-    board = [["" for _ in range(size)] for _ in range(size)]
-    
-    # Lista ekstremalnych promocji
-    promos = ["12S", "10L", "8S", "6L", "5S", "4L", "3S", "2L"]
-    
-    # Obliczamy ile pól to 30%
-    total_cells = size * size
-    promo_count = int(total_cells * 0.30)
-    
-    # Losujemy pozycje dla promocji
-    positions = [(r, c) for r in range(size) for c in range(size)]
-    promo_positions = random.sample(positions, promo_count)
-    
-    for r, c in promo_positions:
-        board[r][c] = random.choice(promos)
-        
+import argparse
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import layout
+
+# Lista ekstremalnych promocji
+PROMOS = ["12S", "10L", "8S", "6L", "5S", "4L", "3S", "2L"]
+SYMMETRIES = ("none", "mirror", "rotational", "classic")
+
+
+def symmetrize(grid, symmetry):
+    # Każde pole dostaje wartość swojego reprezentanta w grupie symetrii
+    size = grid.shape[0]
+    r, c = np.indices(grid.shape)
+    if symmetry == "mirror":
+        return grid[r, np.minimum(c, size - 1 - c)]
+    if symmetry == "rotational":
+        return np.where(r * size + c <= (size - 1 - r) * size + (size - 1 - c), grid, grid[::-1, ::-1])
+    if symmetry == "classic":
+        # Jak klasyczna plansza: lustro w pionie, poziomie i po przekątnej
+        rr, cc = np.minimum(r, size - 1 - r), np.minimum(c, size - 1 - c)
+        return grid[np.minimum(rr, cc), np.maximum(rr, cc)]
+    return grid
+
+
+def generate_board(size=25, density=0.30, promos=PROMOS, weights=None, symmetry="none", seed=None,
+                   corners="12S", centre="3S"):
+    # Macierz kodów: 0 = zwykłe pole, k = promos[k - 1]
+    rng = np.random.default_rng(seed)
+    grid = np.where(rng.random((size, size)) < density,
+                    rng.choice(len(promos), size=(size, size), p=weights) + 1, 0)
+    grid = symmetrize(grid, symmetry)
+    labels = np.array([""] + list(promos), dtype=object)
+    board = labels[grid]
     # Gwarantowane ekstremalne w rogach i na środku
-    board[0][0] = board[0][24] = board[24][0] = board[24][24] = "12S"
-    board[12][12] = "3S" # Start
-    
-    df = pd.DataFrame(board)
-    df.to_excel("plansza.ods", engine="odf", index=False, header=False)
-    print("Plik plansza.ods (25x25) został wygenerowany!")
+    if corners: board[0, 0] = board[0, -1] = board[-1, 0] = board[-1, -1] = corners
+    if centre: board[size // 2, size // 2] = centre
+    return board
+
+
+def premium_map_of(board):
+    rows, cols = np.nonzero(board != "")
+    return {(int(r), int(c)): layout.premium(*layout.parse_cell(board[r, c])) for r, c in zip(rows, cols)}
+
+
+def save_board(board, path):
+    if path.endswith(layout.SUFFIX):
+        layout.write_layout(path, board.shape[0], premium_map_of(board))
+    else:
+        import pandas as pd
+        pd.DataFrame(board).to_excel(path, engine="odf", index=False, header=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generator plansz z premiami")
+    parser.add_argument("--size", type=int, default=25)
+    parser.add_argument("--density", type=float, default=0.30, help="udział pól z premią")
+    parser.add_argument("--promos", nargs="+", default=PROMOS)
+    parser.add_argument("--weights", nargs="+", type=float, help="względne częstości premii (jak --promos)")
+    parser.add_argument("--symmetry", choices=SYMMETRIES, default="none")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--corners", default="12S", help="premia w rogach ('' = losowa)")
+    parser.add_argument("--centre", default="3S", help="premia na środku ('' = losowa)")
+    parser.add_argument("--count", type=int, default=1, help="liczba plansz (tryb wsadowy)")
+    parser.add_argument("--format", choices=["ods", "layout", "both"], default=None,
+                        help="ods dla jednej planszy, layout w trybie wsadowym")
+    parser.add_argument("--out", default=None, help="plik (jedna plansza) lub katalog (tryb wsadowy)")
+    args = parser.parse_args(argv)
+
+    weights = None
+    if args.weights:
+        weights = np.asarray(args.weights, dtype=float)
+        weights /= weights.sum()
+    fmt = args.format or ("ods" if args.count == 1 else "layout")
+    exts = {"ods": [".ods"], "layout": [layout.SUFFIX], "both": [".ods", layout.SUFFIX]}[fmt]
+    base_seed = args.seed if args.seed is not None else int(np.random.SeedSequence().entropy % (1 << 32))
+
+    for i in range(args.count):
+        seed = base_seed + i
+        board = generate_board(args.size, args.density, args.promos, weights, args.symmetry, seed,
+                               args.corners, args.centre)
+        for ext in exts:
+            if args.count == 1 and args.out: path = os.path.splitext(args.out)[0] + ext
+            elif args.count == 1: path = "plansza" + ext
+            else:
+                os.makedirs(args.out or "plansze", exist_ok=True)
+                path = os.path.join(args.out or "plansze", f"plansza_{args.size}_{args.symmetry}_{seed}{ext}")
+            save_board(board, path)
+    print(f"Wygenerowano {args.count} plansz {args.size}x{args.size} (ziarno {base_seed}, format {fmt})")
+
 
 if __name__ == "__main__":
-    generate_test_board()
\ No newline at end of file
+    main()
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import struct
+
+# Układ premii planszy: (board_dim, premium_map), premium_map: (r, c) -> (rodzaj, mnożnik, kolor).
+# Plik .ods jest parsowany przez pandas tylko przy przebudowie skompilowanego pliku obok niego
+# (plansza.ods -> plansza.ods.layout), kluczowanego czasem modyfikacji i skrótem .ods.
+MAGIC = b"SCRLAY"
+VERSION = 1
+HEADER = struct.Struct("<6sBQ20sHI")  # magic, wersja, mtime_ns źródła, sha1 źródła, wymiar, liczba premii
+ENTRY = struct.Struct("<HHcB")         # wiersz, kolumna, rodzaj (S/L), mnożnik
+PREMIUM_COLORS = {"S": (200, 0, 0), "L": (0, 0, 180)}
+SUFFIX = ".layout"
+
+
+def parse_cell(val):
+    # "3S"/"3W" -> ("S", 3), "2L" -> ("L", 2), inne -> None
+    val = str(val).strip().upper()
+    if val.endswith(('S', 'W')): return "S", int(val[:-1])
+    if val.endswith('L'): return "L", int(val[:-1])
+    return None
+
+
+def premium(kind, mult):
+    return kind, mult, PREMIUM_COLORS[kind]
+
+
+def parse_ods(path):
+    import pandas as pd
+    df = pd.read_excel(path, engine="odf", header=None).fillna("")
+    premium_map = {}
+    for r in range(df.shape[0]):
+        for c in range(df.shape[1]):
+            p = parse_cell(df.iloc[r, c])
+            if p: premium_map[(r, c)] = premium(*p)
+    return max(df.shape), premium_map
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).digest()
+
+
+def write_layout(path, board_dim, premium_map, src_mtime_ns=0, src_hash=b""):
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, src_mtime_ns, src_hash, board_dim, len(premium_map)))
+        for (r, c), (kind, mult, _) in sorted(premium_map.items()):
+            f.write(ENTRY.pack(r, c, kind.encode(), mult))
+
+
+def read_layout(path):
+    # Zwraca (mtime_ns, sha1, board_dim, premium_map) albo None dla uszkodzonego/starego pliku
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size: return None
+    magic, version, mtime_ns, src_hash, board_dim, count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION or len(data) != HEADER.size + count * ENTRY.size: return None
+    premium_map = {}
+    for r, c, kind, mult in ENTRY.iter_unpack(data[HEADER.size:]):
+        premium_map[(r, c)] = premium(kind.decode(), mult)
+    return mtime_ns, src_hash, board_dim, premium_map
+
+
+def load_layout(path="plansza.ods"):
+    # (board_dim, premium_map) lub None gdy brak pliku; plik .layout można też podać bezpośrednio
+    if path.endswith(SUFFIX):
+        cached = read_layout(path) if os.path.exists(path) else None
+        return cached[2:] if cached else None
+    if not os.path.exists(path): return None
+    cache_path = path + SUFFIX
+    mtime_ns = os.stat(path).st_mtime_ns
+    cached = read_layout(cache_path) if os.path.exists(cache_path) else None
+    if cached and cached[0] == mtime_ns: return cached[2:]
+    src_hash = file_hash(path)
+    if cached and cached[1] == src_hash:
+        write_layout(cache_path, cached[2], cached[3], mtime_ns, src_hash)
+        return cached[2:]
+    board_dim, premium_map = parse_ods(path)
+    try:
+        write_layout(cache_path, board_dim, premium_map, mtime_ns, src_hash)
+    except OSError as e:
+        print(f"Nie można zapisać {cache_path}: {e}")
+    return board_dim, premium_map
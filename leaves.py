@@ -0,0 +1,300 @@
+import argparse
+import bisect
+import itertools
+import json
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+import time
+from array import array
+import dictionary
+import engine
+from letters import LETTERS, ALPHABET
+
+# Wartość zostawki (liter zostających na stojaku po ruchu) dla komputera: ruch = punkty + wartość zostawki.
+# Wartości liczone offline z gier komputer-komputer (średni wynik następnego ruchu przy danej zostawce,
+# rozłożony na wkład pojedynczych liter, kolejnych kopii tej samej litery i par liter) dla wszystkich
+# zostawek 1-6 liter możliwych przy rozkładzie LETTERS.
+#
+# Klucz zostawki jest niezależny od kolejności liter: liczba kopii każdej litery w systemie mieszanym
+# (podstawa = maksymalna liczba kopii w zostawce + 1), czyli suma WEIGHT[litera] po płytkach - bez sortowania.
+# Plik .tbl: nagłówek, posortowane klucze uint64, wartości int16 w setnych punktu; mapowany z dysku.
+MAGIC = b"SCRLEAVE"
+VERSION = 1
+HEADER = struct.Struct("<8sII")   # magic, wersja, liczba zostawek
+MAX_LEAVE = engine.RACK_SIZE - 1
+SCALE = 100
+RADIX = [min(count, MAX_LEAVE) + 1 for count, _ in LETTERS.values()]
+WEIGHT = {}
+_place = 1
+for _l, _r in zip(ALPHABET, RADIX):
+    WEIGHT[_l] = _place; _place *= _r
+PRIOR = 50                 # pseudoobserwacje ściągające rzadkie cechy do zera
+FIT_PASSES = 20
+# Krok poprawki pojedynczych liter w przebiegu: wszystkie cechy poprawiane naraz z tych samych reszt, a cechy jednej
+# zostawki są silnie powiązane (kopie tej samej litery), więc pełny krok przestrzeliwuje i wynik oscyluje
+FIT_STEP = 0.5
+# Udział reszty przypisany parze: pary liczone jednym przebiegiem z tych samych reszt, więc reszta zostawki trafia
+# naraz do wszystkich jej par (do 15 przy 6 literach); zmniejszenie ogranicza wielokrotne liczenie tej samej reszty
+PAIR_SHARE = 0.5
+CHECKPOINT_SECONDS = 15
+
+
+def leave_key(letters):
+    key = 0
+    for l in letters: key += WEIGHT[l]
+    return key
+
+
+def decode_key(key):
+    # Klucz -> liczby kopii liter (kolejność ALPHABET)
+    counts = []
+    for r in RADIX:
+        key, c = divmod(key, r)
+        counts.append(c)
+    return counts
+
+
+class LeaveTable:
+    __slots__ = ("path", "_file", "_mm", "keys", "values")
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = None
+        try:
+            # Pusty plik (mmap), za krótki nagłówek, inna wersja albo zła długość - zawsze ValueError
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(self._mm) < HEADER.size: raise ValueError
+            magic, version, count = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != VERSION or len(self._mm) != HEADER.size + count * 10 or sys.byteorder != "little":
+                raise ValueError
+        except ValueError:
+            if self._mm is not None: self._mm.close()
+            self._file.close()
+            raise ValueError(f"Nieobsługiwany albo uszkodzony plik zostawek: {path}") from None
+        view = memoryview(self._mm)
+        self.keys = view[HEADER.size:HEADER.size + count * 8].cast("Q")
+        self.values = view[HEADER.size + count * 8:].cast("h")
+
+    def __len__(self):
+        return len(self.keys)
+
+    def by_key(self, key):
+        # Wartość w punktach; wyszukiwanie binarne bezpośrednio w zmapowanym pliku
+        if not key: return 0.0
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key: return self.values[i] / SCALE
+        return 0.0
+
+    def value(self, letters):
+        return self.by_key(leave_key(letters))
+
+    def close(self):
+        if self._mm.closed: return
+        if hasattr(self, "keys"): self.keys.release(); self.values.release()
+        self._mm.close()
+        self._file.close()
+
+
+def load(path="zostawki.tbl"):
+    if not os.path.exists(path): return None
+    try:
+        return LeaveTable(path)
+    except (OSError, ValueError) as e:
+        print(f"Błąd ładowania zostawek {path}: {e}")
+        return None
+
+
+def choose(moves, rack, table):
+    # Najlepszy ruch wg punktów + wartości zostawki; klucz zostawki = klucz stojaka - płytki ruchu
+    rack_key = leave_key(rack)
+    best, best_eq = None, None
+    for move in moves:
+        key = rack_key
+        for _, _, l in move[1]: key -= WEIGHT[l]
+        eq = move[0] + table.by_key(key)
+        if best is None or eq > best_eq: best, best_eq = move, eq
+    return best
+
+
+_policy_table = []
+
+
+def policy(game, moves, rng):
+    # Polityka dla simulate.py (--policy leaves:policy); przy pustym worku zostawka nic nie znaczy
+    if not _policy_table: _policy_table.append(load())
+    table = _policy_table[0]
+    if not table or not game.bag: return moves[0]
+    return choose(moves, game.rack, table)
+
+
+# --- Budowa offline: gry komputer-komputer ---
+
+_worker = {}
+
+
+def _init_worker(layout_path, dict_path):
+    _worker["setup"] = engine.load_setup(layout_path, dict_path)
+
+
+def _play_chunk(task):
+    # Partie seed..seed+n-1; dla każdego ruchu: zostawka -> wynik następnego ruchu tego samego gracza
+    chunk, seed, n = task
+    board_dim, premium_map, dic = _worker["setup"]
+    stats = {}
+    for s in range(seed, seed + n):
+        game = engine.Game(board_dim, premium_map, dic, seed=s)
+        pending = {1: None, 2: None}
+        for _ in range(engine.MAX_TURNS):
+            if game.finished: break
+            p = game.current_player
+            moves = game.moves()
+            pts = moves[0][0] if moves else 0
+            if pending[p] is not None:
+                entry = stats.setdefault(pending[p], [0, 0])
+                entry[0] += 1; entry[1] += pts
+                pending[p] = None
+            if moves:
+                rack_key = leave_key(game.rack)
+                for _, _, l in moves[0][1]: rack_key -= WEIGHT[l]
+                game.play(moves[0][1])
+                if rack_key and game.bag: pending[p] = rack_key
+            elif not game.exchange(range(len(game.rack))): game.confirm_move()
+    return chunk, stats
+
+
+def fit(stats):
+    # Model: wartość = suma wkładów kolejnych kopii liter + korekty par różnych liter, dopasowany do
+    # (średni wynik następnego ruchu - średnia ogólna); pojedyncze litery iteracyjnie, pary na resztach
+    total_n = sum(n for n, _ in stats.values())
+    mean = sum(s for _, s in stats.values()) / total_n
+    rows = []
+    for key, (n, s) in stats.items():
+        counts = decode_key(key)
+        singles = [(code, k) for code, c in enumerate(counts) for k in range(c)]
+        present = [code for code, c in enumerate(counts) if c]
+        rows.append((n, s / n - mean, singles, list(itertools.combinations(present, 2))))
+    single = {}
+    for _ in range(FIT_PASSES):
+        num, den = {}, {}
+        for n, y, singles, _ in rows:
+            r = y - sum(single.get(f, 0.0) for f in singles)
+            for f in singles:
+                num[f] = num.get(f, 0.0) + n * r; den[f] = den.get(f, 0) + n
+        for f in num: single[f] = single.get(f, 0.0) + FIT_STEP * num[f] / (den[f] + PRIOR)
+    num, den = {}, {}
+    for n, y, singles, pairs in rows:
+        r = y - sum(single.get(f, 0.0) for f in singles)
+        for f in pairs:
+            num[f] = num.get(f, 0.0) + n * r; den[f] = den.get(f, 0) + n
+    pair = {f: PAIR_SHARE * num[f] / (den[f] + PRIOR) for f in num}
+    return mean, single, pair
+
+
+def _table_part(task):
+    # Wszystkie zostawki o danym rozmiarze zaczynające się od danej litery (kolejność ALPHABET)
+    size, first, single, pair = task
+    keys, values = array("Q"), array("h")
+    limit = [r - 1 for r in RADIX]
+    places = [WEIGHT[l] for l in ALPHABET]
+    for rest in itertools.combinations_with_replacement(range(first, len(ALPHABET)), size - 1):
+        codes = (first,) + rest
+        key, v, prev, k, present = 0, 0.0, -1, 0, []
+        ok = True
+        for code in codes:
+            if code == prev: k += 1
+            else:
+                prev, k = code, 0
+                for m in present: v += pair.get((m, code), 0.0)
+                present.append(code)
+            if k >= limit[code]: ok = False; break
+            key += places[code]
+            v += single.get((code, k), 0.0)
+        if not ok: continue
+        keys.append(key); values.append(max(-32768, min(32767, round(v * SCALE))))
+    return keys, values
+
+
+def write_table(path, keys, values):
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(keys)))
+        array("Q", (keys[i] for i in order)).tofile(f)
+        array("h", (values[i] for i in order)).tofile(f)
+    os.replace(tmp, path)
+
+
+def save_checkpoint(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Budowa tablicy wartości zostawek z gier komputer-komputer")
+    parser.add_argument("--layout", default="plansza.ods")
+    parser.add_argument("--dictionary", default="slowa.dawg")
+    parser.add_argument("--games", type=int, default=20000)
+    parser.add_argument("--chunk", type=int, default=20, help="gier w jednym zadaniu (i między zapisami stanu)")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="zostawki.tbl")
+    parser.add_argument("--restart", action="store_true", help="zacznij od nowa mimo zapisanego stanu")
+    args = parser.parse_args(argv)
+
+    if not dictionary.load(args.dictionary):
+        print(f"Brak słownika {args.dictionary} - budowa wymaga pliku .dawg"); return 1
+    ckpt = args.out + ".stan"
+    settings = {"seed": args.seed, "chunk": args.chunk}  # --games można zwiększyć przy wznowieniu
+    state = {"settings": settings, "done": [], "stats": {}}
+    if os.path.exists(ckpt) and not args.restart:
+        with open(ckpt, encoding="utf-8") as f:
+            state = json.load(f)
+        if state["settings"] != settings:
+            print(f"{ckpt}: inne ustawienia {state['settings']} - użyj tych samych albo --restart"); return 1
+        print(f"Wznowienie: {len(state['done'])} zadań gotowych", file=sys.stderr)
+    stats = {int(k): v for k, v in state["stats"].items()}
+    done = set(state["done"])
+    tasks = [(i, args.seed + i * args.chunk, min(args.chunk, args.games - i * args.chunk))
+             for i in range((args.games + args.chunk - 1) // args.chunk) if i not in done]
+
+    t0 = last_save = time.perf_counter()
+    init_args = (args.layout, args.dictionary)
+
+    def checkpoint():
+        save_checkpoint(ckpt, {"settings": settings, "done": sorted(done), "stats": stats})
+
+    with multiprocessing.Pool(args.workers, initializer=_init_worker, initargs=init_args) as pool:
+        try:
+            for n, (chunk, part) in enumerate(pool.imap_unordered(_play_chunk, tasks), 1):
+                for key, (cnt, s) in part.items():
+                    entry = stats.setdefault(key, [0, 0])
+                    entry[0] += cnt; entry[1] += s
+                done.add(chunk)
+                if time.perf_counter() - last_save >= CHECKPOINT_SECONDS or n == len(tasks):
+                    checkpoint(); last_save = time.perf_counter()
+                    print(f"{len(done)} zadań, {len(stats)} różnych zostawek, "
+                          f"{n * args.chunk / (time.perf_counter() - t0):.1f} gier/s", file=sys.stderr)
+        except KeyboardInterrupt:
+            checkpoint()
+            print(f"Przerwano - stan zapisany w {ckpt}, uruchom ponownie, aby kontynuować"); return 130
+        if not stats:
+            print("Brak danych z gier"); return 1
+        mean, single, pair = fit(stats)
+        parts = [(size, first, single, pair) for size in range(1, MAX_LEAVE + 1) for first in range(len(ALPHABET))]
+        keys, values = array("Q"), array("h")
+        for k, v in pool.imap(_table_part, parts, chunksize=4):
+            keys.extend(k); values.extend(v)
+    write_table(args.out, keys, values)
+    print(f"Zapisano {args.out}: {len(keys)} zostawek, średni wynik ruchu {mean:.1f} pkt "
+          f"({time.perf_counter() - t0:.0f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import dictionary
+import engine
+import server
+
+# Test obciążenia serwera gry: coraz więcej równoczesnych partii, każda rozgrywana przez dwa połączenia.
+# Partie to gotowe skrypty gier komputer-komputer (ziarno + akcje), odtwarzane na serwerze z tym samym ziarnem
+# (serwer z --testy), więc klient nie liczy ruchów i mierzy tylko serwer: opóźnienie = wysłanie akcji -> zmiana "d".
+# Między akcjami gracz "myśli" średnio --mysl s. Poziom jest utrzymany, gdy p99 <= --slo ms i nie ma błędów;
+# gier na rdzeń = liczba partii / zajętość procesora serwera (serwer działa w jednym wątku).
+
+
+def script_game(board_dim, premium_map, dic, seed):
+    # (ziarno, [(gracz, zakodowany komunikat)], czy partia kończy się sama na serwerze)
+    game = engine.Game(board_dim, premium_map, dic, seed=seed)
+    actions = []
+    while not game.finished and len(actions) < engine.MAX_TURNS:
+        p = game.current_player
+        best = game.best_move()
+        if best:
+            game.play(best[1])
+            actions.append((p, server.encode({"t": "move", "m": best[1]})))
+        else:
+            indices = list(range(len(game.rack)))
+            if game.exchange(indices): actions.append((p, server.encode({"t": "ex", "i": indices})))
+            else: game.confirm_move(); actions.append((p, server.encode({"t": "pass"})))
+    return seed, actions, game.finished
+
+
+_worker = {}
+
+
+def init_worker(layout_path, dict_path):
+    _worker["setup"] = engine.load_setup(layout_path, dict_path)
+
+
+def make_script(seed):
+    return script_game(*_worker["setup"], seed)
+
+
+async def until(conn, kind):
+    while True:
+        msg = await conn.recv()
+        if msg["t"] == kind: return msg
+
+
+async def game_loop(host, port, scripts, think, deadline, warm, stats, rng, name):
+    # Kolejne partie na tej samej parze połączeń aż do końca etapu
+    await asyncio.sleep(rng.uniform(0, think))
+    conns = {1: await server.Connection.open(host, port), 2: await server.Connection.open(host, port)}
+    try:
+        n = 0
+        while time.perf_counter() < deadline:
+            seed, actions, natural = rng.choice(scripts)
+            room, n = f"{name}-{n}", n + 1
+            conns[1].send({"t": "join", "name": "A", "room": room, "seed": seed})
+            await until(conns[1], "wait")
+            conns[2].send({"t": "join", "name": "B", "room": room, "seed": seed})
+            await until(conns[1], "start"); await until(conns[2], "start")
+            done = 0
+            for p, data in actions:
+                await asyncio.sleep(think * rng.uniform(0.5, 1.5))
+                if time.perf_counter() >= deadline: break
+                t0 = time.perf_counter()
+                conns[p].writer.write(data)
+                msg = await conns[p].recv()
+                t1 = time.perf_counter()
+                if msg["t"] != "d": stats["errors"] += 1; break
+                await until(conns[3 - p], "d")
+                if t0 >= warm: stats["lat"].append(t1 - t0)
+                done += 1
+            if done < len(actions) or not natural: conns[1].send({"t": "end"})
+            else: stats["games"] += 1
+            await until(conns[1], "end"); await until(conns[2], "end")
+    finally:
+        for c in conns.values(): c.close()
+
+
+async def run_stage(host, port, scripts, games, think, seconds, warmup, seed):
+    now = time.perf_counter()
+    stats = {"lat": [], "games": 0, "errors": 0}
+    tasks = [game_loop(host, port, scripts, think, now + seconds, now + warmup, stats,
+                       random.Random(seed * 1000003 + i), f"{seed}-{i}") for i in range(games)]
+    for res in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(res, Exception): stats["errors"] += 1
+    return stats
+
+
+def stage_worker(job):
+    server.raise_open_files()
+    return asyncio.run(run_stage(*job))
+
+
+def server_stats(host, port):
+    with socket.create_connection((host, port)) as s:
+        s.sendall(server.encode({"t": "stats"}))
+        return json.loads(s.makefile("rb").readline())
+
+
+def start_server(args):
+    cmd = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py"), "start", "--testy",
+           "--host", args.host, "--port", str(args.port), "--layout", args.layout, "--dictionary", args.dictionary]
+    proc = subprocess.Popen(cmd)
+    for _ in range(100):
+        try:
+            server_stats(args.host, args.port); return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("Serwer nie wystartował")
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test obciążenia serwera gry (server.py start --testy)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=server.DEFAULT_PORT)
+    parser.add_argument("--start", action="store_true", help="uruchom serwer na czas testu (te same plansza i słownik)")
+    parser.add_argument("--layout", default="plansza.ods")
+    parser.add_argument("--dictionary", default="slowa.dawg")
+    parser.add_argument("--gry", type=int, nargs="+", default=[50, 100, 200, 500, 1000, 2000], help="liczby równoczesnych partii")
+    parser.add_argument("--czas", type=float, default=30, help="czas etapu w s")
+    parser.add_argument("--rozgrzewka", type=float, default=5, help="początek etapu bez pomiaru, s")
+    parser.add_argument("--mysl", type=float, default=1.0, help="średni czas między akcjami gracza, s")
+    parser.add_argument("--slo", type=float, default=50, help="próg p99 w ms")
+    parser.add_argument("--skrypty", type=int, default=20, help="liczba różnych partii do odtwarzania")
+    parser.add_argument("--procesy", type=int, default=1, help="procesy klienta (serwer najlepiej na innym rdzeniu)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="wyniki etapów do pliku JSON")
+    args = parser.parse_args(argv)
+
+    if not dictionary.load(args.dictionary):
+        print(f"Brak słownika {args.dictionary} - skrypty partii wymagają pliku .dawg"); return 1
+    server.raise_open_files()
+    t0 = time.perf_counter()
+    seeds = [args.seed + i for i in range(args.skrypty)]
+    with multiprocessing.Pool(args.procesy, initializer=init_worker, initargs=(args.layout, args.dictionary)) as pool:
+        scripts = pool.map(make_script, seeds)
+    print(f"{len(scripts)} skryptów partii ({sum(len(s[1]) for s in scripts)} akcji) w {time.perf_counter() - t0:.1f} s")
+
+    proc = start_server(args) if args.start else None
+    results, sustained = [], None
+    try:
+        print(f"{'gier':>6} {'akcji/s':>8} {'p50 ms':>7} {'p99 ms':>7} {'CPU serw.':>9} {'gier/rdzeń':>10} {'błędy':>6}")
+        for games in args.gry:
+            before, w0 = server_stats(args.host, args.port), time.perf_counter()
+            jobs = [(args.host, args.port, scripts, games // args.procesy + (i < games % args.procesy), args.mysl,
+                     args.czas, args.rozgrzewka, args.seed * 1000 + i) for i in range(args.procesy)]
+            if args.procesy > 1:
+                with multiprocessing.Pool(args.procesy) as pool: parts = pool.map(stage_worker, jobs)
+            else: parts = [stage_worker(jobs[0])]
+            after, wall = server_stats(args.host, args.port), time.perf_counter() - w0
+            lat = sorted(x for part in parts for x in part["lat"])
+            errors = sum(part["errors"] for part in parts)
+            cpu = (after["cpu"] - before["cpu"]) / wall
+            res = {"games": games, "actions_per_s": len(lat) / (args.czas - args.rozgrzewka),
+                   "p50_ms": percentile(lat, 0.50) * 1000, "p99_ms": percentile(lat, 0.99) * 1000,
+                   "server_cpu": cpu, "games_per_core": games / cpu if cpu else 0.0, "errors": errors,
+                   "finished_games": sum(part["games"] for part in parts)}
+            results.append(res)
+            print(f"{games:>6} {res['actions_per_s']:>8.0f} {res['p50_ms']:>7.2f} {res['p99_ms']:>7.2f} "
+                  f"{cpu:>8.0%} {res['games_per_core']:>10.0f} {errors:>6}", flush=True)
+            if res["p99_ms"] > args.slo or errors: break
+            sustained = res
+    finally:
+        if proc: proc.terminate(); proc.wait()
+    if sustained:
+        print(f"Utrzymane: {sustained['games']} równoczesnych partii (p99 {sustained['p99_ms']:.1f} ms <= {args.slo:g} ms), "
+              f"ok. {sustained['games_per_core']:.0f} partii na rdzeń przy {args.mysl:g} s na akcję")
+    else: print(f"Żaden poziom nie zmieścił się w p99 <= {args.slo:g} ms")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: json.dump({"settings": vars(args), "stages": results}, f, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,23 @@
+import argparse
+import atexit
+import json
 import pygame
+import socket
 import sys
 import os
-import random
-import pandas as pd
-import calc
+import threading
+import time
+import analysis
+import dictionary
+import engine
+import layout
+import leaves
+import profiler
+import record
+import server
 import datetime
+import calc
+from letters import LETTERS
 
 # --- STAŁE ---
 COLOR_BG = (10, 45, 10)
@@ -14,40 +27,87 @@ COLOR_TILE = (245, 222, 179)
 COLOR_TEXT = (40, 40, 40)
 COLOR_SELECT = (173, 216, 230)
 
-LETTERS = {
-    'A': (9, 1), 'Ą': (1, 5), 'B': (2, 3), 'C': (3, 2), 'Ć': (1, 6),
-    'D': (3, 2), 'E': (7, 1), 'Ę': (1, 5), 'F': (1, 5), 'G': (2, 3),
-    'H': (2, 3), 'I': (8, 1), 'J': (2, 3), 'K': (3, 2), 'L': (3, 2),
-    'Ł': (2, 3), 'M': (3, 2), 'N': (5, 1), 'Ń': (1, 7), 'O': (6, 1),
-    'Ó': (1, 5), 'P': (3, 2), 'R': (4, 1), 'S': (4, 1), 'Ś': (1, 5),
-    'T': (3, 2), 'U': (2, 3), 'W': (4, 1), 'Y': (4, 2), 'Z': (5, 1),
-    'Ź': (1, 9), 'Ż': (1, 5)
-}
+ASSETS_READY = pygame.USEREVENT + 1
+ANALYSIS_READY = pygame.USEREVENT + 2
+NET_MESSAGE = pygame.USEREVENT + 3
+COMPUTER_READY = pygame.USEREVENT + 4
+PROFILE_REFRESH_MS = 250
+READABLE_TILE = 28      # domyślny minimalny bok pola w pikselach (duże plansze są wtedy przewijane)
+MIN_VISIBLE_CELLS = 5   # największy zoom: tyle pól w oknie planszy
+PAN_KEYS = {pygame.K_LEFT: (-1, 0), pygame.K_RIGHT: (1, 0), pygame.K_UP: (0, -1), pygame.K_DOWN: (0, 1)}
 
 class ScrabbleGame:
-    def __init__(self):
+    def __init__(self, resume=None, net=None, room=None, profile=None):
+        self.startup_times = {}
+        # Profiler (F3 / --profil) - przed wczytaniem planszy, żeby --profil zmierzył też load_board_config
+        self.prof = profiler.Profiler(profile or "profil.csv")
+        atexit.register(self.prof.disable)
+        if profile: self.toggle_profiler()
+        t0 = time.perf_counter()
         pygame.init()
         pygame.mixer.init()
         self.screen = pygame.display.set_mode((1280, 720), pygame.RESIZABLE)
         pygame.display.set_caption("SCRABBLE PRO - Pełna Wersja")
-        
-        self.sounds = self.load_sounds()
+        self.mark_phase("pygame", t0)
+
+        # Dźwięki i czcionki systemowe ładują się w tle; do tego czasu działa wbudowana czcionka
+        self.sounds = {}
+        self.fonts_ready = False
+        self.font_cache = {}
+        threading.Thread(target=self.load_assets, daemon=True).start()
+        t0 = time.perf_counter()
         self.board_dim = 15
         self.premium_map = {}
         self.load_board_config()
+        self.mark_phase("plansza", t0)
+        t0 = time.perf_counter()
+        dic = dictionary.load("slowa.dawg")
+        self.game = engine.Game(self.board_dim, self.premium_map, dic)
+        self.mark_phase("słownik", t0)
+        self.leave_table = leaves.load()  # wartości zostawek dla komputera (python leaves.py), None = same punkty
         self.resolutions = self.load_resolutions()
         
         self.game_state = "START_SCREEN"
         self.player_names = {1: "Gracz 1", 2: "Gracz 2"}
+        self.computer_players = set()
         self.input_active = 1
         self.winner_text = ""
         self.show_res_menu = False
         
         self.last_exit_click_time = 0
         self.floating_tile = None 
+        self.float_rect = None
+        self.scene = None
+        self.dirty = True
+        self.view_x = self.view_y = 0
+        self.pan_anchor = None
         
-        self.recalculate_dimensions()
         self.reset_game()
+        if resume:
+            # Wznowienie zapisanej partii: plansza z zapisu, kolejne ruchy dopisywane do tego samego pliku
+            self.game, info = record.resume(resume, dic)
+            self.board_dim, self.premium_map = info["board_dim"], info["premium_map"]
+            self.player_names = info["names"]
+            self.game_state, self.last_state = "PLAYING", self.game.state
+            if self.game.finished: self.game_state, self.winner_text = "GAME_OVER", "PARTIA ZAKOŃCZONA"
+        self.analyzer = None
+        self.start_analyzer()
+        # Migawka, dla której wątek liczy ruch komputera; podpowiedź czekająca na wynik analizy
+        self.thinking = self.hint_pending = None
+        # Gra przez serwer (server.py): zasady liczy serwer, tu jest lustro partii z własnym stojakiem
+        self.net, self.net_room, self.you = None, room, None
+        if net:
+            host, _, port = net.partition(":")
+            self.net = socket.create_connection((host or "127.0.0.1", int(port or server.DEFAULT_PORT)))
+            threading.Thread(target=self.net_listen, daemon=True).start()
+        self.recalculate_dimensions()
+
+    def start_analyzer(self):
+        # Analiza ruchów w osobnym procesie; wynik wraca zdarzeniem, które budzi pętlę gry
+        if self.analyzer: self.analyzer.close()
+        self.analyzer = None
+        if self.game.dictionary:
+            self.analyzer = analysis.Analyzer(self.game.dictionary, self.board_dim, self.premium_map, self.post_analysis)
 
     def load_resolutions(self):
         res = []
@@ -74,84 +134,221 @@ class ScrabbleGame:
                     print(f"Błąd ładowania dźwięku {path}: {e}")
         return s
 
+    def load_assets(self):
+        # Wątek tła nie pisze do startup_times (czyta je pętla gry) - czasy wracają w zdarzeniu ASSETS_READY
+        times = {}
+        t0 = time.perf_counter()
+        self.sounds = self.load_sounds()
+        times["dźwięki (tło)"] = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        pygame.sysfont.get_fonts()
+        times["czcionki (tło)"] = (time.perf_counter() - t0) * 1000
+        pygame.event.post(pygame.event.Event(ASSETS_READY, times=times))
+
+    def mark_phase(self, name, t0):
+        self.startup_times[name] = (time.perf_counter() - t0) * 1000
+
+    def toggle_profiler(self):
+        if not self.prof.toggle():
+            self.calc_text = f"Profil zapisany: {self.prof.path}"; return
+        for attr, name in (("handle_click", "handle_click"), ("recalculate_dimensions", "wymiary"),
+                           ("load_board_config", "load_board_config")):
+            self.prof.instrument(self, attr, name)
+        self.prof.instrument(calc, "calculate_move_score", "punktacja ruchu")
+
+    def draw_profile(self):
+        # Nakładka profilera w lewym górnym rogu (pod paskiem), półprzezroczyste tło
+        font, color = self.font_calc, (255, 255, 120)
+        title = font.render(f"PROFIL (F3) -> {self.prof.path}", True, color)
+        cells = [[font.render(t, True, color) for t in row] for row in self.prof.report()]
+        widths = [max(row[k].get_width() for row in cells) + 12 for k in range(len(cells[0]))]
+        h = font.get_linesize()
+        box = pygame.Surface((max(sum(widths), title.get_width()) + 16, h * (len(cells) + 1) + 12), pygame.SRCALPHA)
+        box.fill((0, 0, 0, 190))
+        box.blit(title, (8, 6))
+        for i, row in enumerate(cells):
+            x = 8
+            for k, surf in enumerate(row):
+                # nazwa fazy do lewej, liczby do prawej krawędzi kolumny
+                box.blit(surf, (x if k == 0 else x + widths[k] - surf.get_width(), 6 + (i + 1) * h))
+                x += widths[k]
+        self.screen.blit(box, (10, 45))
+
+    def report_startup(self):
+        print("Start: " + ", ".join(f"{k} {v:.0f} ms" for k, v in self.startup_times.items()))
+
+    def make_font(self, name, size):
+        # Czcionki w cache per (nazwa, rozmiar), więc powrót do poprzedniego zoomu ich nie odtwarza
+        key = (name, max(1, size))
+        font = self.font_cache.get(key)
+        if font is None:
+            font = pygame.font.SysFont(name, key[1], bold=True) if self.fonts_ready else pygame.font.Font(None, key[1])
+            self.font_cache[key] = font
+        return font
+
     def play_snd(self, i):
         if i in self.sounds: self.sounds[i].play()
 
     def load_board_config(self):
-        if os.path.exists("plansza.ods"):
-            try:
-                df = pd.read_excel("plansza.ods", engine="odf", header=None).fillna("")
-                self.board_dim = max(df.shape)
-                for r in range(df.shape[0]):
-                    for c in range(df.shape[1]):
-                        val = str(df.iloc[r, c]).strip().upper()
-                        if val.endswith(('S', 'W')): self.premium_map[(r, c)] = ("S", int(val[:-1]), (200, 0, 0))
-                        elif val.endswith('L'): self.premium_map[(r, c)] = ("L", int(val[:-1]), (0, 0, 180))
-            except: pass
+        # Skompilowany plansza.ods.layout pozwala pominąć import pandas przy kolejnych uruchomieniach
+        try:
+            loaded = layout.load_layout("plansza.ods") or layout.load_layout("plansza.layout")
+            if loaded: self.board_dim, self.premium_map = loaded
+        except Exception as e: print(f"Błąd wczytywania planszy: {e}")
 
     def recalculate_dimensions(self):
         sw, sh = self.screen.get_size()
-        self.tile_size = int((sh * 0.70) // self.board_dim)
-        self.board_x = (sw - (self.board_dim * self.tile_size)) // 2
+        # Okno planszy ma bok 70% wysokości; większa plansza jest w nim przewijana i skalowana
+        self.view_size = int(sh * 0.70)
+        self.min_tile = max(2, self.view_size // self.board_dim)
+        self.max_tile = max(self.min_tile, self.view_size // MIN_VISIBLE_CELLS)
         self.board_y = int(sh * 0.15)
         
-        self.font_tile = pygame.font.SysFont("Arial", int(self.tile_size * 0.5), bold=True)
-        self.font_small = pygame.font.SysFont("Arial", int(self.tile_size * 0.25), bold=True)
-        self.font_ui = pygame.font.SysFont("Verdana", int(sh * 0.022), bold=True)
-        self.font_ui_tiny = pygame.font.SysFont("Verdana", int(sh * 0.014), bold=True)
-        self.font_calc = pygame.font.SysFont("Courier New", int(sh * 0.018), bold=True)
-
-        self.rack_size = int(self.tile_size * 1.1)
-        self.rack1_x = self.board_x - self.tile_size - self.rack_size
-        self.rack2_x = self.board_x + (self.board_dim * self.tile_size) + self.tile_size
-
-        btn_w, btn_h, spacing = int(sw * 0.18), int(sh * 0.06), 15
-        start_x = (sw - (4 * btn_w + 3 * spacing)) // 2
+        self.font_ui = self.make_font("Verdana", int(sh * 0.022))
+        self.font_ui_tiny = self.make_font("Verdana", int(sh * 0.014))
+        self.font_calc = self.make_font("Courier New", int(sh * 0.018))
+
+        base_tile = min(self.max_tile, max(self.min_tile, READABLE_TILE))
+        self.rack_size = int(min(self.view_size // 9, base_tile) * 1.1)
+
+        btn_w, btn_h, spacing = int(sw * 0.15), int(sh * 0.06), 15
+        start_x = (sw - (5 * btn_w + 4 * spacing)) // 2
         btn_y = int(sh * 0.91)
 
         self.btn_ok = pygame.Rect(start_x, btn_y, btn_w, btn_h)
         self.btn_ex = pygame.Rect(start_x + (btn_w + spacing), btn_y, btn_w, btn_h)
         self.btn_end = pygame.Rect(start_x + 2 * (btn_w + spacing), btn_y, btn_w, btn_h)
-        self.btn_exit = pygame.Rect(start_x + 3 * (btn_w + spacing), btn_y, btn_w, btn_h)
+        self.btn_hint = pygame.Rect(start_x + 3 * (btn_w + spacing), btn_y, btn_w, btn_h)
+        self.btn_exit = pygame.Rect(start_x + 4 * (btn_w + spacing), btn_y, btn_w, btn_h)
         self.btn_res_toggle = pygame.Rect(10, 5, 180, 25)
 
+        self.tile_cache = {}
+        self.set_tile_size(base_tile)
+
+    def set_tile_size(self, tile_size, anchor=None):
+        # anchor: punkt ekranu, pod którym po zmianie zoomu ma zostać to samo miejsce planszy
+        tile_size = max(self.min_tile, min(self.max_tile, tile_size))
+        if anchor:
+            ax, ay = anchor[0] - self.view_rect.x, anchor[1] - self.view_rect.y
+            bx, by = (ax + self.view_x) / self.tile_size, (ay + self.view_y) / self.tile_size
+        self.tile_size = tile_size
+        view_w = min(self.board_dim * tile_size, self.view_size)
+        self.view_rect = pygame.Rect((self.screen.get_width() - view_w) // 2, self.board_y, view_w, view_w)
+        if anchor: self.view_x, self.view_y = int(bx * tile_size - ax), int(by * tile_size - ay)
+        gap = int(self.rack_size / 1.1)
+        self.rack1_x = self.view_rect.x - gap - self.rack_size
+        self.rack2_x = self.view_rect.right + gap
+        self.scroll_view(0, 0)
+
+    def zoom(self, steps, anchor=None):
+        t = self.tile_size
+        new = max(t + 1, int(t * 1.25)) if steps > 0 else min(t - 1, int(t * 0.8))
+        self.set_tile_size(new, anchor or self.view_rect.center)
+
+    def scroll_view(self, dx, dy):
+        limit = self.board_dim * self.tile_size - self.view_rect.w
+        self.view_x = max(0, min(limit, self.view_x + dx))
+        self.view_y = max(0, min(limit, self.view_y + dy))
+        self.view_layer = None; self.dirty = True
+
+    def visible_cells(self):
+        t = self.tile_size
+        r0, c0 = self.view_y // t, self.view_x // t
+        r1 = min(self.board_dim, (self.view_y + self.view_rect.h - 1) // t + 1)
+        c1 = min(self.board_dim, (self.view_x + self.view_rect.w - 1) // t + 1)
+        return r0, r1, c0, c1
+
+    def cell_pos(self, r, c):
+        return self.view_rect.x + c * self.tile_size - self.view_x, self.view_rect.y + r * self.tile_size - self.view_y
+
+    def cell_at(self, mx, my):
+        return (my - self.view_rect.y + self.view_y) // self.tile_size, (mx - self.view_rect.x + self.view_x) // self.tile_size
+
+    def build_view_layer(self):
+        # Statyczna warstwa widocznego wycinka (tła pól, siatka, napisy premii) - tylko po przewinięciu, zoomie lub zmianie wymiarów
+        t = self.tile_size
+        self.view_layer = pygame.Surface(self.view_rect.size)
+        self.view_layer.fill(COLOR_BOARD)
+        font_small = self.make_font("Arial", int(t * 0.25))
+        r0, r1, c0, c1 = self.visible_cells()
+        for r in range(r0, r1):
+            for c in range(c0, c1):
+                x, y = c * t - self.view_x, r * t - self.view_y
+                rect = pygame.Rect(x, y, t, t)
+                prem = self.premium_map.get((r, c))
+                if prem: pygame.draw.rect(self.view_layer, prem[2], rect)
+                pygame.draw.rect(self.view_layer, COLOR_GRID, rect, 1)
+                if prem and t >= 16:
+                    # TUTAJ PRZYWRÓCONE NAPISY: np. 3S lub 2L
+                    p_txt = font_small.render(f"{prem[1]}{prem[0]}", True, (255,255,255))
+                    self.view_layer.blit(p_txt, (x + (t - p_txt.get_width())//2, y + (t - p_txt.get_height())//2))
+
     def reset_game(self):
-        self.board_state = [[None for _ in range(self.board_dim)] for _ in range(self.board_dim)]
-        self.bag = [l for l, (count, _) in LETTERS.items() for _ in range(count)]
-        random.shuffle(self.bag)
-        self.racks = {1: self.draw_tiles(7), 2: self.draw_tiles(7)}
-        self.scores = {1: 0, 2: 0}
-        self.current_player = 1
+        self.game.reset()
         self.floating_tile = None 
         self.exchange_mode = False
         self.exchange_selected = []
         self.calc_text = ""
-
-    def draw_tiles(self, n):
-        tiles = []
-        for _ in range(min(n, len(self.bag))):
-            tiles.append(self.bag.pop())
-        return tiles
+        self.undo_stack, self.redo_stack, self.last_state = [], [], self.game.state
+
+    def track_history(self):
+        # Każda zakończona akcja daje nowy game.state - poprzednia migawka trafia na stos cofania
+        state = self.game.state
+        if state is not self.last_state:
+            self.undo_stack.append(self.last_state); self.redo_stack.clear(); self.last_state = state
+
+    def post_analysis(self, job_id, result):
+        # Wywoływane z wątku nasłuchu analizy - pygame.event.post jest bezpieczne między wątkami
+        pygame.event.post(pygame.event.Event(ANALYSIS_READY, job_id=job_id, result=result))
+
+    def my_turn(self):
+        # Ruch należy do człowieka przy tym oknie
+        p = self.game.current_player
+        return p not in self.computer_players and (not self.net or p == self.you)
+
+    def request_analysis(self):
+        if self.analyzer and self.game_state == "PLAYING" and self.my_turn():
+            self.analyzer.request(self.game.state)
+
+    def analysis_result(self):
+        if not self.analyzer or not self.my_turn(): return None
+        return self.analyzer.result()
+
+    def step_history(self, source, target, label):
+        # Cofnij/ponów do najbliższej decyzji człowieka - ruchy komputera przechodzą razem z nią
+        if not source or self.game_state != "PLAYING" or self.net: return
+        self.return_tiles_to_rack(); self.exchange_mode = False
+        target.append(self.game.state)
+        state = source.pop()
+        while source and state.current_player in self.computer_players:
+            target.append(state); state = source.pop()
+        self.game.restore(state); self.last_state = state
+        self.calc_text = f"{label} (cofnij: {len(self.undo_stack)}, ponów: {len(self.redo_stack)})"
 
     def return_tiles_to_rack(self):
         if self.floating_tile:
-            self.racks[self.current_player].append(self.floating_tile)
+            self.game.return_to_rack(self.floating_tile)
             self.floating_tile = None
-        for r in range(self.board_dim):
-            for c in range(self.board_dim):
-                tile = self.board_state[r][c]
-                if tile and tile['new']:
-                    self.racks[self.current_player].append(tile['letter'])
-                    self.board_state[r][c] = None
+        self.game.return_tiles()
+
+    def tile_surface(self, letter, color, size):
+        # Gotowe płytki w cache: (litera, kolor, rozmiar) -> Surface
+        key = (letter, color, size)
+        surf = self.tile_cache.get(key)
+        if surf is None:
+            surf = pygame.Surface((size, size), pygame.SRCALPHA)
+            rect = pygame.Rect(0, 0, size-2, size-2)
+            pygame.draw.rect(surf, color, rect, border_radius=int(size*0.1))
+            pygame.draw.rect(surf, (0,0,0), rect, 1)
+            l_surf = self.make_font("Arial", int(size * 0.5)).render(letter, True, COLOR_TEXT)
+            surf.blit(l_surf, ((size - l_surf.get_width())//2, size//10))
+            p_surf = self.make_font("Arial", int(size * 0.25)).render(str(LETTERS[letter][1]), True, COLOR_TEXT)
+            surf.blit(p_surf, (size - p_surf.get_width() - 2, size - p_surf.get_height() - 2))
+            self.tile_cache[key] = surf
+        return surf
 
     def draw_tile_obj(self, letter, x, y, color, size):
-        rect = pygame.Rect(x, y, size-2, size-2)
-        pygame.draw.rect(self.screen, color, rect, border_radius=int(size*0.1))
-        pygame.draw.rect(self.screen, (0,0,0), rect, 1)
-        l_surf = self.font_tile.render(letter, True, COLOR_TEXT)
-        self.screen.blit(l_surf, (x + (size - l_surf.get_width())//2, y + size//10))
-        p_surf = self.font_small.render(str(LETTERS[letter][1]), True, COLOR_TEXT)
-        self.screen.blit(p_surf, (x + size - p_surf.get_width() - 2, y + size - p_surf.get_height() - 2))
+        return self.screen.blit(self.tile_surface(letter, color, size), (x, y))
 
     def draw_res_list(self):
         menu_w, menu_h = 220, len(self.resolutions) * 30
@@ -164,9 +361,34 @@ class ScrabbleGame:
             self.screen.blit(t, (r_rect.x + 10, r_rect.y + 5))
 
     def draw(self):
+        # Pełna scena tylko po zmianie stanu; samo przeciąganie płytki odświeża dwa prostokąty
+        prof = self.prof
+        prof.start()
+        if self.dirty:
+            self.draw_scene()
+            if prof.enabled: self.draw_profile(); prof.lap_outside("nakładka profilu")
+            self.scene = self.screen.copy() if self.floating_tile else None
+            self.float_rect = self.draw_floating()
+            prof.lap("płytka w ręce")
+            pygame.display.flip(); self.dirty = False
+            prof.lap("flip")
+        elif self.floating_tile and self.scene:
+            old = self.float_rect
+            self.screen.blit(self.scene, old, old)
+            self.float_rect = self.draw_floating()
+            pygame.display.update([old, self.float_rect])
+            prof.lap("przeciąganie")
+
+    def draw_floating(self):
+        if not self.floating_tile: return None
+        mx, my = pygame.mouse.get_pos()
+        return self.draw_tile_obj(self.floating_tile, mx-self.rack_size//2, my-self.rack_size//2, (255,255,200), self.rack_size)
+
+    def draw_scene(self):
         sw, sh = self.screen.get_size()
         if self.game_state == "START_SCREEN":
             self.draw_start_screen(sw, sh)
+            self.prof.lap("ekran startowy")
             return
 
         self.screen.fill(COLOR_BG)
@@ -177,64 +399,66 @@ class ScrabbleGame:
         res_t = self.font_ui_tiny.render("Rozdzielczość", True, (255, 255, 255))
         self.screen.blit(res_t, (self.btn_res_toggle.centerx - res_t.get_width()//2, self.btn_res_toggle.centery - res_t.get_height()//2))
 
-        bag_count_txt = self.font_ui.render(f"W worku: {len(self.bag)}", True, (255, 255, 0))
+        game = self.game
+        bag_count_txt = self.font_ui.render(f"W worku: {len(game.bag)}", True, (255, 255, 0))
         self.screen.blit(bag_count_txt, (sw // 2 - bag_count_txt.get_width() // 2, 5))
 
-        turn_txt = self.font_ui.render(f"GRACZ: {self.player_names[self.current_player]}", True, (255, 255, 255))
+        turn_txt = self.font_ui.render(f"GRACZ: {self.player_names[game.current_player]}", True, (255, 255, 255))
         self.screen.blit(turn_txt, (sw//2 - turn_txt.get_width()//2, 45))
         if self.calc_text:
             c_surf = self.font_calc.render(self.calc_text, True, (0, 255, 0))
             self.screen.blit(c_surf, (sw//2 - c_surf.get_width()//2, 85))
-
-        # PLANSZA Z NAPISAMI PROMOCJI
-        for r in range(self.board_dim):
-            for c in range(self.board_dim):
-                x, y = self.board_x + c * self.tile_size, self.board_y + r * self.tile_size
-                rect = pygame.Rect(x, y, self.tile_size, self.tile_size)
-                prem = self.premium_map.get((r, c))
-                
-                # Tło pola
-                pygame.draw.rect(self.screen, prem[2] if prem else COLOR_BOARD, rect)
-                pygame.draw.rect(self.screen, COLOR_GRID, rect, 1)
-                
-                tile = self.board_state[r][c]
-                if tile:
-                    t_col = (200, 255, 200) if tile['new'] else COLOR_TILE
-                    self.draw_tile_obj(tile['letter'], x, y, t_col, self.tile_size)
-                elif prem:
-                    # TUTAJ PRZYWRÓCONE NAPISY: np. 3S lub 2L
-                    label = f"{prem[1]}{prem[0]}"
-                    p_txt = self.font_small.render(label, True, (255,255,255))
-                    self.screen.blit(p_txt, (x + (self.tile_size - p_txt.get_width())//2, y + (self.tile_size - p_txt.get_height())//2))
+        if self.analyzer and self.my_turn():
+            res = self.analysis_result()
+            a_txt = f"Analiza: {res['count']} ruchów, najlepszy {res['best']} pkt" if res else "Analiza..."
+            a_surf = self.font_ui_tiny.render(a_txt, True, (150, 200, 255))
+            self.screen.blit(a_surf, (sw - a_surf.get_width() - 10, 20 - a_surf.get_height() // 2))
+
+        self.prof.lap("tło")
+
+        # PLANSZA: warstwa statyczna wycinka + zajęte pola tylko z widocznego obszaru
+        if self.view_layer is None: self.build_view_layer()
+        self.screen.blit(self.view_layer, self.view_rect)
+        board, dim = game.board, self.board_dim
+        r0, r1, c0, c1 = self.visible_cells()
+        self.screen.set_clip(self.view_rect)
+        for r in range(r0, r1):
+            row = board.cells[r * dim + c0:r * dim + c1]
+            if not any(row): continue
+            for k, code in enumerate(row):
+                if code:
+                    c = c0 + k
+                    t_col = (200, 255, 200) if board.is_new(r, c) else COLOR_TILE
+                    self.draw_tile_obj(board.letter_at(r, c), *self.cell_pos(r, c), t_col, self.tile_size)
+        self.screen.set_clip(None)
+        self.prof.lap("plansza")
 
         # STOJAKI
         for p in [1, 2]:
             rx = self.rack1_x if p == 1 else self.rack2_x
-            for i, l in enumerate(self.racks[p]):
-                col = COLOR_SELECT if (self.exchange_mode and self.current_player==p and i in self.exchange_selected) else COLOR_TILE
+            for i, l in enumerate(game.racks[p]):
+                col = COLOR_SELECT if (self.exchange_mode and game.current_player==p and i in self.exchange_selected) else COLOR_TILE
                 self.draw_tile_obj(l, rx, self.board_y + i*self.rack_size, col, self.rack_size)
+        self.prof.lap("stojaki")
 
         # PRZYCISKI DOLNE
         ex_color = (0, 100, 200) if self.exchange_mode else (80, 80, 80)
         btns = [(self.btn_ok, "OK", (0, 100, 0)), (self.btn_ex, "WYMIANA", ex_color), 
-                (self.btn_end, "PODSUMUJ", (60, 60, 60)), (self.btn_exit, "WYJDŹ", (150, 0, 0))]
+                (self.btn_end, "PODDAJ SIĘ" if self.net else "PODSUMUJ", (60, 60, 60)), (self.btn_hint, "PODPOWIEDŹ", (120, 90, 0)), (self.btn_exit, "WYJDŹ", (150, 0, 0))]
         for b, txt, col in btns:
             pygame.draw.rect(self.screen, col, b, border_radius=8)
             t_s = self.font_ui_tiny.render(txt, True, (255,255,255))
             self.screen.blit(t_s, (b.centerx - t_s.get_width()//2, b.centery - t_s.get_height()//2))
 
         # WYNIKI
-        p1_pts = self.font_ui.render(f"{self.player_names[1]}: {self.scores[1]}", True, (255,255,255))
+        p1_pts = self.font_ui.render(f"{self.player_names[1]}: {game.scores[1]}", True, (255,255,255))
         self.screen.blit(p1_pts, (20, sh * 0.92))
-        p2_pts = self.font_ui.render(f"{self.player_names[2]}: {self.scores[2]}", True, (255,255,255))
+        p2_pts = self.font_ui.render(f"{self.player_names[2]}: {game.scores[2]}", True, (255,255,255))
         self.screen.blit(p2_pts, (sw - p2_pts.get_width() - 20, sh * 0.92))
 
         if self.show_res_menu: self.draw_res_list()
         if self.game_state == "GAME_OVER": self.draw_summary_overlay(sw, sh)
-        if self.floating_tile:
-            mx, my = pygame.mouse.get_pos()
-            self.draw_tile_obj(self.floating_tile, mx-self.rack_size//2, my-self.rack_size//2, (255,255,200), self.rack_size)
-        pygame.display.flip()
+        self.prof.lap("przyciski")
 
     def draw_start_screen(self, sw, sh):
         self.screen.fill((20, 30, 20))
@@ -250,7 +474,10 @@ class ScrabbleGame:
         pygame.draw.rect(self.screen, (0,150,0), self.btn_start, border_radius=10)
         st = self.font_ui.render("START", True, (255,255,255))
         self.screen.blit(st, (self.btn_start.centerx-st.get_width()//2, self.btn_start.centery-st.get_height()//2))
-        pygame.display.flip()
+        self.btn_ai = pygame.Rect(sw//2-150, sh//2+145, 300, 35)
+        pygame.draw.rect(self.screen, (0,100,150) if 2 in self.computer_players else (50,50,50), self.btn_ai, border_radius=5)
+        ai_t = self.font_ui_tiny.render("Gracz 2: KOMPUTER" if 2 in self.computer_players else "Gracz 2: CZŁOWIEK", True, (255,255,255))
+        self.screen.blit(ai_t, (self.btn_ai.centerx-ai_t.get_width()//2, self.btn_ai.centery-ai_t.get_height()//2))
 
     def handle_click(self, pos):
         mx, my = pos
@@ -262,82 +489,176 @@ class ScrabbleGame:
             self.show_res_menu = False; return
 
         if self.game_state == "START_SCREEN":
-            if self.btn_start.collidepoint(mx, my): self.game_state = "PLAYING"
+            if self.btn_start.collidepoint(mx, my): self.start_game()
             elif self.rect_p1.collidepoint(mx, my): self.input_active = 1
             elif self.rect_p2.collidepoint(mx, my): self.input_active = 2
+            elif self.btn_ai.collidepoint(mx, my) and not self.net:
+                if 2 in self.computer_players: self.computer_players.discard(2); self.player_names[2] = "Gracz 2"
+                else: self.computer_players.add(2); self.player_names[2] = "Komputer"
+            return
+
+        if self.game_state == "GAME_OVER":
+            # Pod podsumowaniem plansza i przyciski są nieaktywne; KONIEC zamyka grę
+            if self.btn_ok_final.collidepoint(mx, my): pygame.quit(); sys.exit()
             return
 
         if self.btn_res_toggle.collidepoint(mx, my): self.show_res_menu = True; return
+        if (self.net or self.thinking) and not (self.game_state == "PLAYING" and self.my_turn()):
+            # Gra sieciowa (zakończenie = poddanie) albo komputer myśli: poza swoją kolejką tylko zakończenie i wyjście
+            if self.btn_end.collidepoint(mx, my) and self.game_state == "PLAYING": self.end_game(manual=True)
+            elif self.btn_exit.collidepoint(mx, my): self.handle_exit_logic()
+            return
         if self.btn_ok.collidepoint(mx, my): self.confirm_move(); return
         if self.btn_ex.collidepoint(mx, my): self.handle_exchange(); return
         if self.btn_end.collidepoint(mx, my): self.end_game(manual=True); return
+        if self.btn_hint.collidepoint(mx, my): self.show_hint(); return
         if self.btn_exit.collidepoint(mx, my): self.handle_exit_logic(); return
 
-        curr_rack_x = self.rack1_x if self.current_player == 1 else self.rack2_x
+        game = self.game
+        curr_rack_x = self.rack1_x if game.current_player == 1 else self.rack2_x
         if curr_rack_x <= mx <= curr_rack_x + self.rack_size:
             if self.floating_tile:
-                if len(self.racks[self.current_player]) < 7:
-                    self.racks[self.current_player].append(self.floating_tile)
+                if len(game.rack) < engine.RACK_SIZE:
+                    game.return_to_rack(self.floating_tile)
                     self.floating_tile = None; self.play_snd(1)
                 return
             else:
                 idx = (my - self.board_y) // self.rack_size
-                if 0 <= idx < len(self.racks[self.current_player]):
+                if 0 <= idx < len(game.rack):
                     if self.exchange_mode:
                         if idx in self.exchange_selected: self.exchange_selected.remove(idx)
                         else: self.exchange_selected.append(idx)
                     else:
-                        self.floating_tile = self.racks[self.current_player].pop(idx)
+                        self.floating_tile = game.take_from_rack(idx)
                         self.play_snd(1)
                 return
 
-        c, r = (mx - self.board_x) // self.tile_size, (my - self.board_y) // self.tile_size
-        if 0 <= r < self.board_dim and 0 <= c < self.board_dim:
-            if self.floating_tile and not self.board_state[r][c]:
-                self.board_state[r][c] = {'letter': self.floating_tile, 'new': True}
-                self.floating_tile = None; self.play_snd(1)
-            elif self.board_state[r][c] and self.board_state[r][c]['new']:
-                self.racks[self.current_player].append(self.board_state[r][c]['letter'])
-                self.board_state[r][c] = None; self.play_snd(1)
+        if self.view_rect.collidepoint(mx, my):
+            r, c = self.cell_at(mx, my)
+            if self.floating_tile:
+                if game.place(r, c, self.floating_tile):
+                    self.floating_tile = None; self.play_snd(1)
+            elif game.pick_up(r, c): self.play_snd(1)
 
     def handle_exchange(self):
-        if len(self.bag) < 7: self.calc_text = "Za mało w worku!"; return
+        if len(self.game.bag) < engine.RACK_SIZE: self.calc_text = "Za mało w worku!"; return
         if not self.exchange_mode:
             self.return_tiles_to_rack()
             self.exchange_mode = True; self.exchange_selected = []; self.calc_text = "Wybierz litery i kliknij WYMIANA"
         else:
-            if self.exchange_selected:
-                self.exchange_selected.sort(reverse=True)
-                for i in self.exchange_selected:
-                    self.bag.append(self.racks[self.current_player].pop(i))
-                random.shuffle(self.bag)
-                needed = 7 - len(self.racks[self.current_player])
-                self.racks[self.current_player].extend(self.draw_tiles(needed))
-                self.current_player = 2 if self.current_player == 1 else 1
+            if self.exchange_selected and self.net: self.net_send({"t": "ex", "i": self.exchange_selected})
+            elif self.exchange_selected and self.game.exchange(self.exchange_selected):
                 self.play_snd(4); self.calc_text = "Wymieniono."
             self.exchange_mode = False; self.exchange_selected = []
 
     def confirm_move(self):
-        new_tiles = [(r, c) for r in range(self.board_dim) for c in range(self.board_dim) 
-                     if self.board_state[r][c] and self.board_state[r][c]['new']]
-        if not new_tiles:
-            self.current_player = 2 if self.current_player == 1 else 1; return
-        pts, math = calc.calculate_full_score(self.board_state, self.premium_map, self.board_dim, LETTERS)
-        if pts > 0:
-            self.scores[self.current_player] += pts
-            for r, c in new_tiles: self.board_state[r][c]['new'] = False
-            needed = 7 - len(self.racks[self.current_player])
-            self.racks[self.current_player].extend(self.draw_tiles(needed))
-            self.current_player = 2 if self.current_player == 1 else 1
-            self.play_snd(2); self.calc_text = math
-        else: self.play_snd(3)
+        if self.net:
+            # Ruch sprawdza serwer; płytki leżą na planszy do jego odpowiedzi
+            self.net_send({"t": "move", "m": self.game.placed} if self.game.placed else {"t": "pass"}); return
+        if not self.game.placed: self.game.confirm_move(); return
+        ok, text = self.game.confirm_move()
+        self.play_snd(2 if ok else 3)
+        if text: self.calc_text = text
+
+    def show_hint(self):
+        self.return_tiles_to_rack(); self.exchange_mode = False
+        if not self.game.dictionary: self.calc_text = "Brak słownika - podpowiedź niedostępna"; return
+        res = self.analysis_result()
+        # Bez gotowej analizy podpowiedź pojawi się po jej wyniku (ANALYSIS_READY) - pętla gry nie liczy ruchów
+        if not res: self.hint_pending, self.calc_text = self.game.state, "Liczenie podpowiedzi..."; return
+        self.hint_pending = None
+        best = res["moves"][0] if res["moves"] else None
+        if not best: self.calc_text = "Brak możliwych ruchów"; return
+        self.game.lay(best[1])
+        self.calc_text = f"Podpowiedź: {best[0]} pkt"; self.play_snd(1)
+
+    def computer_move(self):
+        # Ruch szukany w wątku na kopii gry, więc okno dalej się rysuje; wynik wraca zdarzeniem COMPUTER_READY
+        if self.thinking is self.game.state: return
+        self.thinking = self.game.state
+        threading.Thread(target=self.think, args=(self.game.copy(), self.leave_table, self.thinking), daemon=True).start()
+
+    @staticmethod
+    def think(game, leave_table, state):
+        best = None
+        if game.dictionary:
+            if leave_table and game.bag:
+                moves = game.moves()
+                best = leaves.choose(moves, game.rack, leave_table) if moves else None
+            else: best = game.best_move()
+        pygame.event.post(pygame.event.Event(COMPUTER_READY, state=state, best=best))
+
+    def apply_computer_move(self, state, best):
+        # Wynik dla pozycji, która już minęła (cofnięcie, koniec partii), jest pomijany
+        if state is not self.thinking: return
+        self.thinking = None
+        if state is not self.game.state or self.game_state != "PLAYING": return
+        if best:
+            ok, text = self.game.play(best[1])
+            self.play_snd(2); self.calc_text = text
+        elif self.game.exchange(range(len(self.game.rack))): self.play_snd(4); self.calc_text = "Komputer wymienił litery."
+        else: self.game.confirm_move(); self.calc_text = "Komputer pasuje."
+
+    def start_game(self):
+        if self.net:
+            # Partia zaczyna się po dobraniu przeciwnika (komunikat "start"); zapis prowadzi serwer (--zapis)
+            self.game.racks = {1: [], 2: []}
+            self.net_send({"t": "join", "name": self.player_names[1], "room": self.net_room})
+            self.game_state = "WAITING"; return
+        # Każda partia zapisywana na bieżąco do partie/ (podgląd i wznawianie: record.py, --wznow)
+        record.GameRecorder(f"partie/gra_{datetime.datetime.now():%Y%m%d_%H%M%S}.scrrec", self.game, self.player_names)
+        self.game_state = "PLAYING"
 
     def end_game(self, manual=False):
-        for p in [1, 2]: self.scores[p] -= sum(LETTERS[l][1] for l in self.racks[p])
-        s1, s2 = self.scores[1], self.scores[2]
-        self.winner_text = f"WYGRAŁ {self.player_names[1]}!" if s1 > s2 else (f"WYGRAŁ {self.player_names[2]}!" if s2 > s1 else "REMIS!")
+        if self.net: self.net_send({"t": "end"}); return
+        winner = self.game.end_game()
+        # Rekord END już zapisany - plik partii zamykany od razu, nie przy wyjściu z programu
+        if self.game.recorder: self.game.recorder.close()
+        self.winner_text = f"WYGRAŁ {self.player_names[winner]}!" if winner else "REMIS!"
         self.game_state = "GAME_OVER"
 
+    def net_listen(self):
+        # Wątek odbioru: każda linia od serwera jako zdarzenie pygame - stan zmienia tylko pętla gry
+        try:
+            for line in self.net.makefile("rb"):
+                pygame.event.post(pygame.event.Event(NET_MESSAGE, msg=json.loads(line)))
+        except OSError:
+            pass
+        pygame.event.post(pygame.event.Event(NET_MESSAGE, msg={"t": "end", "why": "Utracono połączenie z serwerem"}))
+
+    def net_send(self, msg):
+        try:
+            self.net.sendall(server.encode(msg))
+        except OSError:
+            self.calc_text = "Brak połączenia z serwerem"
+
+    def net_message(self, msg):
+        kind = msg["t"]
+        if kind == "wait": self.calc_text = "Czekanie na przeciwnika..."
+        elif kind == "start":
+            self.game, self.you = server.mirror_game(msg, self.game.dictionary), msg["you"]
+            self.player_names = {1: msg["names"][0], 2: msg["names"][1]}
+            if (self.board_dim, self.premium_map) != (self.game.board_dim, self.game.premium_map):
+                self.board_dim, self.premium_map = self.game.board_dim, self.game.premium_map
+                self.start_analyzer(); self.recalculate_dimensions()
+            self.floating_tile, self.exchange_mode, self.exchange_selected = None, False, []
+            self.undo_stack, self.redo_stack, self.last_state = [], [], self.game.state
+            self.game_state, self.calc_text = "PLAYING", f"Grasz jako {self.player_names[self.you]}"
+        elif kind == "d":
+            self.return_tiles_to_rack()
+            server.apply_delta(self.game, msg, self.you)
+            self.last_state = self.game.state
+            name = self.player_names[msg["p"]]
+            if "m" in msg: self.calc_text = f"{name}: +{msg['pts']} pkt"; self.play_snd(2)
+            elif "x" in msg: self.calc_text = f"{name} wymienił litery ({msg['x']})"; self.play_snd(4)
+            else: self.calc_text = f"{name} pasuje"
+        elif kind == "err": self.calc_text = msg["msg"]; self.play_snd(3)
+        elif kind == "end" and self.game_state != "GAME_OVER":
+            if "s" in msg: self.game.scores = {1: msg["s"][0], 2: msg["s"][1]}
+            winner = msg.get("w")
+            self.winner_text = f"WYGRAŁ {self.player_names[winner]}!" if winner else ("REMIS!" if "s" in msg else msg["why"])
+            self.game.finished, self.calc_text, self.game_state = True, msg["why"], "GAME_OVER"
+
     def handle_exit_logic(self):
         now = pygame.time.get_ticks()
         if now - self.last_exit_click_time < 500: pygame.quit(); sys.exit()
@@ -357,18 +678,69 @@ class ScrabbleGame:
 
     def run(self):
         clock = pygame.time.Clock()
+        t0 = time.perf_counter()
+        self.draw()
+        self.mark_phase("pierwsza klatka", t0)
+        self.report_startup()
         while True:
-            for event in pygame.event.get():
+            # Bez animacji i ruchu komputera pętla czeka na zdarzenie zamiast rysować 60 klatek/s
+            computer_turn = self.game_state == "PLAYING" and self.game.current_player in self.computer_players
+            waiting = not computer_turn or self.thinking is self.game.state
+            if not waiting: events = pygame.event.get()
+            else:
+                # Z nakładką profilera pętla budzi się co PROFILE_REFRESH_MS, żeby wyniki nie stały w miejscu
+                first = pygame.event.wait(PROFILE_REFRESH_MS) if self.prof.enabled else pygame.event.wait()
+                events = [first] + pygame.event.get()
+            self.prof.begin()
+            for event in events:
+                if event.type != pygame.MOUSEMOTION: self.dirty = True
                 if event.type == pygame.QUIT: pygame.quit(); sys.exit()
+                if event.type == ANALYSIS_READY:
+                    self.analyzer.store(event.job_id, event.result)
+                    if self.hint_pending is self.game.state and self.analysis_result(): self.show_hint()
+                if event.type == COMPUTER_READY: self.apply_computer_move(event.state, event.best)
+                if event.type == NET_MESSAGE: self.net_message(event.msg)
+                if event.type == ASSETS_READY:
+                    self.startup_times.update(event.times)
+                    self.fonts_ready = True; self.font_cache = {}; self.recalculate_dimensions(); self.report_startup()
                 if event.type == pygame.VIDEORESIZE: self.screen = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE); self.recalculate_dimensions()
-                if event.type == pygame.MOUSEBUTTONDOWN: self.handle_click(event.pos)
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    if event.button == 1: self.handle_click(event.pos)
+                    elif event.button == 3 and self.game_state == "PLAYING": self.pan_anchor = event.pos
+                if event.type == pygame.MOUSEBUTTONUP and event.button == 3: self.pan_anchor = None
+                if event.type == pygame.MOUSEMOTION and self.pan_anchor:
+                    # Przesuwanie planszy prawym przyciskiem myszy
+                    (px, py), (mx, my) = self.pan_anchor, event.pos
+                    self.scroll_view(px - mx, py - my); self.pan_anchor = event.pos
+                if event.type == pygame.MOUSEWHEEL and self.game_state == "PLAYING": self.zoom(event.y, pygame.mouse.get_pos())
                 if event.type == pygame.KEYDOWN:
-                    if self.game_state == "START_SCREEN":
+                    if event.key == pygame.K_F3: self.toggle_profiler()
+                    elif self.game_state == "START_SCREEN":
                         if event.key == pygame.K_BACKSPACE: self.player_names[self.input_active] = self.player_names[self.input_active][:-1]
-                        elif event.key == pygame.K_RETURN: self.game_state = "PLAYING"
+                        elif event.key == pygame.K_RETURN: self.start_game()
                         else: self.player_names[self.input_active] += event.unicode
+                    elif event.key == pygame.K_z and event.mod & pygame.KMOD_CTRL:
+                        if event.mod & pygame.KMOD_SHIFT: self.step_history(self.redo_stack, self.undo_stack, "Ponowiono")
+                        else: self.step_history(self.undo_stack, self.redo_stack, "Cofnięto")
+                    elif event.key == pygame.K_y and event.mod & pygame.KMOD_CTRL: self.step_history(self.redo_stack, self.undo_stack, "Ponowiono")
                     elif event.key == pygame.K_ESCAPE: self.return_tiles_to_rack()
-            self.draw(); clock.tick(60)
+                    elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS): self.zoom(1)
+                    elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS): self.zoom(-1)
+                    elif event.key in PAN_KEYS:
+                        dx, dy = PAN_KEYS[event.key]; self.scroll_view(dx * self.tile_size, dy * self.tile_size)
+            # Partię kończy silnik (ostatnia płytka przy pustym worku, tury bez punktów); tu tylko podsumowanie
+            if self.game_state == "PLAYING" and self.game.finished and not self.net: self.end_game()
+            elif computer_turn: self.computer_move()
+            self.track_history()
+            self.request_analysis()
+            self.draw(); self.prof.end(); clock.tick(60)
 
 if __name__ == "__main__":
-    ScrabbleGame().run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrabble")
+    parser.add_argument("--wznow", metavar="PLIK", help="wznów partię z zapisu .scrrec")
+    parser.add_argument("--serwer", metavar="HOST:PORT", help="graj przez serwer (python server.py start)")
+    parser.add_argument("--pokoj", help="z --serwer: graj z tym, kto poda ten sam pokój")
+    parser.add_argument("--profil", nargs="?", const="profil.csv", metavar="PLIK",
+                        help="pomiar czasów od startu (F3 włącza/wyłącza); ślad .csv albo .json")
+    args = parser.parse_args()
+    ScrabbleGame(resume=args.wznow, net=args.serwer, room=args.pokoj, profile=args.profil).run()
\ No newline at end of file
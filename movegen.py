@@ -0,0 +1,220 @@
+from dictionary import CODE_MASK, EOW_BIT, LAST_BIT
+from letters import LETTERS, ALPHABET, CODES
+
+# Generator ruchów Appel-Jacobson: pola-kotwice + zbiory cross-check (maska bitowa kodów liter).
+# cross[0] dotyczy ruchów poziomych (sprawdza słowa pionowe), cross[1] - ruchów pionowych.
+# Wpis cache: (maska, suma punktów liter słowa poprzecznego lub -1 gdy go nie ma).
+# Punktacja liczona w locie musi dawać to samo co calc.calculate_move_score.
+ALL_LETTERS = sum(1 << code for code in CODES.values())
+VALUES = [0] + [LETTERS[l][1] for l in ALPHABET]
+BINGO_TILES, BINGO_BONUS = 7, 50
+NO_CROSS = (ALL_LETTERS, -1)
+
+
+class MoveGenerator:
+    __slots__ = ("board", "dictionary", "premium_map", "cross")
+
+    def __init__(self, board, dictionary, premium_map):
+        self.board = board
+        self.dictionary = dictionary
+        self.premium_map = premium_map
+        n = board.dim * board.dim
+        self.cross = ([None] * n, [None] * n)
+
+    def update(self, placed):
+        # Po zatwierdzonym ruchu zmieniają się tylko pola na końcach serii przechodzących przez nowe płytki.
+        # Zwraca usunięte wpisy (d, pole, wpis) - restore() cofa zmianę (przeszukiwanie końcówki)
+        dim, cells = self.board.dim, self.board.cells
+        saved = []
+        for r, c, _ in placed:
+            for d, (dr, dc) in ((0, (1, 0)), (1, (0, 1))):
+                for sign in (-1, 1):
+                    rr, cc = r, c
+                    while 0 <= rr < dim and 0 <= cc < dim and cells[rr * dim + cc]:
+                        rr += sign * dr; cc += sign * dc
+                    if 0 <= rr < dim and 0 <= cc < dim:
+                        i = rr * dim + cc
+                        saved.append((d, i, self.cross[d][i])); self.cross[d][i] = None
+        return saved
+
+    def restore(self, saved):
+        for d, i, entry in reversed(saved): self.cross[d][i] = entry
+
+    def cross_check(self, d, r, c):
+        i = r * self.board.dim + c
+        entry = self.cross[d][i]
+        if entry is None: entry = self.cross[d][i] = self._compute_cross(d, r, c)
+        return entry
+
+    def _compute_cross(self, d, r, c):
+        dim, cells, dic = self.board.dim, self.board.cells, self.dictionary
+        dr, dc = (1, 0) if d == 0 else (0, 1)
+        before = []
+        rr, cc = r - dr, c - dc
+        while rr >= 0 and cc >= 0 and cells[rr * dim + cc]:
+            before.append(cells[rr * dim + cc]); rr -= dr; cc -= dc
+        before.reverse()
+        after = []
+        rr, cc = r + dr, c + dc
+        while rr < dim and cc < dim and cells[rr * dim + cc]:
+            after.append(cells[rr * dim + cc]); rr += dr; cc += dc
+        if not before and not after: return NO_CROSS
+        pts = sum(VALUES[code] for code in before) + sum(VALUES[code] for code in after)
+        node = dic.root
+        for code in before:
+            e = dic.step(node, code)
+            if not e: return 0, pts
+            node = e >> 8
+        mask = 0
+        for e in dic.children(node):
+            n, eow = e >> 8, e & EOW_BIT
+            for code in after:
+                e2 = dic.step(n, code)
+                if not e2: eow = 0; break
+                n, eow = e2 >> 8, e2 & EOW_BIT
+            if eow: mask |= 1 << (e & CODE_MASK)
+        return mask, pts
+
+    def left_parts(self, counts, max_len):
+        # Lewe części ze stojaka (wspólne dla wszystkich kotwic): dla długości k lista (węzeł, kody, maska liter,
+        # które mogą po nich stanąć na kotwicy - ze stojaka pomniejszonego o te kody)
+        edges = self.dictionary.edges
+        by_len = [[] for _ in range(max_len + 1)]
+
+        def walk(node, partial):
+            mask, i = 0, node
+            while i:
+                e = edges[i]
+                code = e & CODE_MASK
+                if counts[code]:
+                    mask |= 1 << code
+                    if len(partial) < max_len:
+                        counts[code] -= 1; partial.append(code)
+                        walk(e >> 8, partial)
+                        partial.pop(); counts[code] += 1
+                if e & LAST_BIT: break
+                i += 1
+            if mask: by_len[len(partial)].append((node, tuple(partial), mask))
+
+        walk(self.dictionary.root, [])
+        return by_len
+
+    def generate(self, rack, cancelled=None):
+        # Wszystkie legalne ruchy dla stojaka: lista (punkty, [(r, c, litera), ...]) malejąco po punktach;
+        # cancelled() sprawdzane przed każdą linią - przerwane generowanie zwraca None
+        if not self.dictionary: return []
+        dic = self.dictionary
+        edges, root, step = dic.edges, dic.root, dic.step
+        dim, cells = self.board.dim, self.board.cells
+        counts = [0] * (len(ALPHABET) + 1)
+        for l in rack: counts[CODES[l]] += 1
+        moves, singles = [], set()
+        first_move = not any(cells)
+        centre = dim // 2
+        prefixes = self.left_parts(counts, max(0, len(rack) - 1))
+        line_new = [0] * dim
+
+        for d in (0, 1):
+            for line in range(dim):
+                if cancelled and cancelled(): return None
+                if first_move and line != centre: continue
+                coords = [(line, p) for p in range(dim)] if d == 0 else [(p, line) for p in range(dim)]
+                line_cells = [cells[r * dim + c] for r, c in coords]
+                if first_move: anchors = [centre]
+                else:
+                    anchors = [p for p in range(dim) if not line_cells[p] and self._has_neighbour(*coords[p])]
+                    if not anchors: continue
+                empty_cross = [None if code else self.cross_check(d, *coords[p]) for p, code in enumerate(line_cells)]
+                line_mask = [e[0] if e else 0 for e in empty_cross]
+                line_xsum = [e[1] if e else -1 for e in empty_cross]
+                line_prem = [self.premium_map.get(rc) for rc in coords]
+
+                def record(ws, we):
+                    # Ruch z co najmniej dwiema płytkami powstaje tylko raz (jedna linia, jego pierwsza kotwica);
+                    # pojedyncza płytka może przyjść z obu kierunków
+                    placed, main, mult, extra, n_new = [], 0, 1, 0, 0
+                    for p in range(ws, we):
+                        code = line_cells[p]
+                        if code: main += VALUES[code]; continue
+                        code = line_new[p]
+                        v, wm = VALUES[code], 1
+                        prem = line_prem[p]
+                        if prem:
+                            if prem[0] == "L": v *= prem[1]
+                            elif prem[0] == "S": wm = prem[1]
+                        main += v; mult *= wm; n_new += 1
+                        if line_xsum[p] >= 0: extra += (line_xsum[p] + v) * wm
+                        placed.append(coords[p] + (ALPHABET[code - 1],))
+                    pts = (main * mult if we - ws > 1 else 0) + extra
+                    if n_new == BINGO_TILES: pts += BINGO_BONUS
+                    if n_new == 1:
+                        if placed[0] in singles: return
+                        singles.add(placed[0])
+                    if pts > 0: moves.append((pts, placed))
+
+                def extend_right(ws, pos, node, eow, anchor):
+                    # Leżące płytki przechodzone w pętli, rekursja tylko po literach ze stojaka
+                    while pos < dim and line_cells[pos]:
+                        code, i = line_cells[pos], node
+                        while i:
+                            e = edges[i]
+                            if e & CODE_MASK == code: break
+                            if e & LAST_BIT: return
+                            i += 1
+                        else: return
+                        node, eow = e >> 8, e & EOW_BIT; pos += 1
+                    if eow and pos > anchor: record(ws, pos)
+                    if pos >= dim: return
+                    mask = line_mask[pos]
+                    i = node
+                    while i:
+                        e = edges[i]
+                        code = e & CODE_MASK
+                        if counts[code] and (mask >> code) & 1:
+                            counts[code] -= 1; line_new[pos] = code
+                            extend_right(ws, pos + 1, e >> 8, e & EOW_BIT, anchor)
+                            line_new[pos] = 0; counts[code] += 1
+                        if e & LAST_BIT: break
+                        i += 1
+
+                prev = -1
+                for a in anchors:
+                    mask = line_mask[a]
+                    if a > 0 and line_cells[a - 1]:
+                        # Przedrostek z płytek już leżących na planszy
+                        p = a - 1
+                        while p > 0 and line_cells[p - 1]: p -= 1
+                        node = root
+                        for q in range(p, a):
+                            e = step(node, line_cells[q])
+                            if not e: break
+                            node = e >> 8
+                        else: extend_right(p, a, node, 0, a)
+                        prev = a; continue
+                    # Lewa część ze stojaka sięga do poprzedniej kotwicy (albo zajętego pola)
+                    for k in range(min(a - prev - 1, len(prefixes) - 1) + 1):
+                        for node, partial, pmask in prefixes[k]:
+                            if not pmask & mask: continue
+                            ws = a - k
+                            for j, code in enumerate(partial): line_new[ws + j] = code; counts[code] -= 1
+                            i = node
+                            while i:
+                                e = edges[i]
+                                code = e & CODE_MASK
+                                if counts[code] and (mask >> code) & 1:
+                                    counts[code] -= 1; line_new[a] = code
+                                    extend_right(ws, a + 1, e >> 8, e & EOW_BIT, a)
+                                    line_new[a] = 0; counts[code] += 1
+                                if e & LAST_BIT: break
+                                i += 1
+                            for j, code in enumerate(partial): line_new[ws + j] = 0; counts[code] += 1
+                    prev = a
+
+        moves.sort(key=lambda m: -m[0])
+        return moves
+
+    def _has_neighbour(self, r, c):
+        dim, cells = self.board.dim, self.board.cells
+        i = r * dim + c
+        return ((r > 0 and cells[i - dim]) or (r < dim - 1 and cells[i + dim])
+                or (c > 0 and cells[i - 1]) or (c < dim - 1 and cells[i + 1]))
@@ -0,0 +1,130 @@
+import collections
+import json
+import time
+
+# Pomiar gorących ścieżek działającej gry (F3 albo main.py --profil): fazy rysowania, kliknięcia, punktacja,
+# przeliczanie wymiarów, wczytanie planszy. Wyłączony profiler to jedno sprawdzenie flagi na fazę rysowania;
+# mierzone funkcje są opakowywane tylko na czas pomiaru i potem przywracane.
+# Każda próbka jest od razu dopisywana do pliku śladu: .csv (czas_s, faza, ms) albo .json ("samples": [[czas_s, faza, ms]],
+# "summary" dopisywane przy wyłączeniu), więc długi pomiar nie trzyma śladu w pamięci.
+WINDOW = 240            # ostatnich próbek na fazę do percentyli w nakładce
+FRAME = "klatka"
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+class Profiler:
+    __slots__ = ("enabled", "path", "samples", "order", "out", "json_sep", "t0", "last", "frame_t", "laps", "patched")
+
+    def __init__(self, path="profil.csv"):
+        self.enabled, self.path = False, path
+        self.samples, self.order = {}, []
+        self.out = self.json_sep = None
+        self.t0 = self.last = 0.0
+        self.frame_t = None
+        self.laps, self.patched = 0, []
+
+    def enable(self):
+        if self.enabled: return
+        self.enabled, self.t0 = True, time.perf_counter()
+        self.samples, self.order = {}, []
+        # Klatka, w której profiler włączono (begin() był jeszcze wyłączony), nie jest zapisywana
+        self.frame_t, self.laps = None, 0
+        self.out = open(self.path, "w", encoding="utf-8")
+        if self.path.endswith(".json"): self.out.write('{"samples": ['); self.json_sep = ""
+        else: self.out.write("czas_s,faza,ms\n")
+
+    def disable(self):
+        # Zdejmuje opakowania i zamyka ślad
+        if not self.enabled: return
+        self.enabled = False
+        for owner, attr, had, saved in reversed(self.patched):
+            if had: setattr(owner, attr, saved)
+            else: delattr(owner, attr)
+        self.patched = []
+        if self.json_sep is not None:
+            self.out.write(f'], "summary": {json.dumps(self.summary(), ensure_ascii=False)}}}')
+            self.json_sep = None
+        self.out.close(); self.out = None
+
+    def toggle(self):
+        if self.enabled: self.disable()
+        else: self.enable()
+        return self.enabled
+
+    def instrument(self, owner, attr, name):
+        # Mierzy wywołania owner.attr (obiekt, klasa albo moduł) do wyłączenia profilera
+        if not self.enabled: return
+        original = getattr(owner, attr)
+
+        def timed(*args, **kwargs):
+            t = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - t)
+
+        self.patched.append((owner, attr, attr in vars(owner), vars(owner).get(attr)))
+        setattr(owner, attr, timed)
+
+    def add(self, name, seconds):
+        if not self.enabled: return
+        ms = seconds * 1000
+        window = self.samples.get(name)
+        if window is None:
+            window = self.samples[name] = collections.deque(maxlen=WINDOW); self.order.append(name)
+        window.append(ms)
+        t = time.perf_counter() - self.t0
+        if self.json_sep is None: self.out.write(f"{t:.6f},{name},{ms:.4f}\n")
+        else:
+            self.out.write(f"{self.json_sep}[{t:.6f}, {json.dumps(name, ensure_ascii=False)}, {ms:.4f}]"); self.json_sep = ", "
+
+    def begin(self):
+        # Początek klatki pętli gry; klatka jest zapisywana tylko, jeśli coś narysowano (end)
+        if not self.enabled: return
+        self.frame_t, self.laps = time.perf_counter(), 0
+
+    def end(self):
+        if not self.enabled or not self.laps or self.frame_t is None: return
+        self.add(FRAME, time.perf_counter() - self.frame_t)
+
+    def start(self):
+        if not self.enabled: return
+        self.last = time.perf_counter()
+
+    def lap(self, name):
+        # Czas od start() albo poprzedniej fazy
+        if not self.enabled: return
+        now = time.perf_counter()
+        self.add(name, now - self.last)
+        self.last, self.laps = now, self.laps + 1
+
+    def lap_outside(self, name):
+        # Jak lap, ale bez wliczania do czasu klatki (rysowanie samej nakładki nie zawyża pokazywanych wyników)
+        if not self.enabled: return
+        now = time.perf_counter()
+        self.add(name, now - self.last)
+        if self.frame_t is not None: self.frame_t += now - self.last
+        self.last = now
+
+    def stats(self, name):
+        # (ostatnia, p50, p95, p99, liczba) w ms z okna ostatnich próbek
+        window = self.samples[name]
+        values = sorted(window)
+        return window[-1], percentile(values, 0.50), percentile(values, 0.95), percentile(values, 0.99), len(values)
+
+    def summary(self):
+        return {name: dict(zip(("last", "p50", "p95", "p99", "n"), self.stats(name))) for name in self.order}
+
+    def report(self):
+        # Wiersze nakładki (kolumny tekstu): klatka, potem fazy w kolejności pierwszego pomiaru
+        # z udziałem w medianie klatki
+        frame = self.stats(FRAME)[1] if FRAME in self.samples else 0.0
+        rows = [("faza", "ost.", "p50", "p95", "p99", "udział")]
+        for name in sorted(self.order, key=lambda n: n != FRAME):
+            last, p50, p95, p99, _ = self.stats(name)
+            share = f"{p50 / frame:.0%}" if frame and name != FRAME else ""
+            rows.append((name, f"{last:.2f}", f"{p50:.2f}", f"{p95:.2f}", f"{p99:.2f}", share))
+        return rows
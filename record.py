@@ -0,0 +1,347 @@
+import argparse
+import os
+import struct
+import engine
+import layout
+from letters import ALPHABET, CODES
+
+# Zapis partii: plik tylko dopisywany (.scrrec), rekordy [typ u8][długość varint][dane].
+# START zawiera ziarno worka, więc partię można odtworzyć akcja po akcji; co SNAPSHOT_EVERY akcji
+# dopisywany jest pełny stan (SNAPSHOT), który pozwala skoczyć do ruchu N bez odtwarzania od początku.
+# Cofnięcie/ponowienie ruchu w grze zapisuje się jako RESTORE (pełny stan, liczony jak akcja).
+MAGIC = b"SCRREC\x01"
+START, PLACE, EXCHANGE, PASS, END, SNAPSHOT, RESTORE = 1, 2, 3, 4, 5, 6, 7
+SNAPSHOT_EVERY = 10
+RNG_STATE = struct.Struct("<625I")
+
+
+def put_uvarint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80); n >>= 7
+    out.append(n)
+
+
+def put_svarint(out, n):
+    put_uvarint(out, n * 2 if n >= 0 else -n * 2 - 1)
+
+
+def get_uvarint(buf, pos):
+    n = shift = 0
+    while True:
+        b = buf[pos]; pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80: return n, pos
+        shift += 7
+
+
+def get_svarint(buf, pos):
+    z, pos = get_uvarint(buf, pos)
+    return (z >> 1) if not z & 1 else -(z >> 1) - 1, pos
+
+
+def put_str(out, s):
+    data = s.encode("utf-8")
+    put_uvarint(out, len(data)); out += data
+
+
+def get_str(buf, pos):
+    n, pos = get_uvarint(buf, pos)
+    return bytes(buf[pos:pos + n]).decode("utf-8"), pos + n
+
+
+def put_letters(out, letters):
+    put_uvarint(out, len(letters)); out += bytes(CODES[l] for l in letters)
+
+
+def get_letters(buf, pos):
+    n, pos = get_uvarint(buf, pos)
+    return [ALPHABET[code - 1] for code in buf[pos:pos + n]], pos + n
+
+
+# --- Kodowanie rekordów ---
+
+def encode_start(game, names):
+    out = bytearray()
+    put_uvarint(out, game.seed); put_uvarint(out, game.board_dim)
+    put_str(out, names[1]); put_str(out, names[2])
+    put_uvarint(out, len(game.premium_map))
+    for (r, c), (kind, mult, _) in sorted(game.premium_map.items()):
+        put_uvarint(out, r); put_uvarint(out, c); out.append(ord(kind)); put_uvarint(out, mult)
+    return out
+
+
+def decode_start(buf):
+    seed, pos = get_uvarint(buf, 0)
+    dim, pos = get_uvarint(buf, pos)
+    n1, pos = get_str(buf, pos)
+    n2, pos = get_str(buf, pos)
+    count, pos = get_uvarint(buf, pos)
+    premium_map = {}
+    for _ in range(count):
+        r, pos = get_uvarint(buf, pos)
+        c, pos = get_uvarint(buf, pos)
+        kind = chr(buf[pos]); pos += 1
+        mult, pos = get_uvarint(buf, pos)
+        premium_map[(r, c)] = layout.premium(kind, mult)
+    return {"seed": seed, "board_dim": dim, "names": {1: n1, 2: n2}, "premium_map": premium_map}
+
+
+def encode_place(placed, points):
+    out = bytearray()
+    put_uvarint(out, points); put_uvarint(out, len(placed))
+    for r, c, l in placed:
+        put_uvarint(out, r); put_uvarint(out, c); out.append(CODES[l])
+    return out
+
+
+def decode_place(buf):
+    points, pos = get_uvarint(buf, 0)
+    n, pos = get_uvarint(buf, pos)
+    placed = []
+    for _ in range(n):
+        r, pos = get_uvarint(buf, pos)
+        c, pos = get_uvarint(buf, pos)
+        placed.append((r, c, ALPHABET[buf[pos] - 1])); pos += 1
+    return points, placed
+
+
+def encode_snapshot(game, action_no):
+    out = bytearray()
+    put_uvarint(out, action_no)
+    tiles = [(i, code) for i, code in enumerate(game.board.cells) if code]
+    put_uvarint(out, len(tiles))
+    for i, code in tiles:
+        put_uvarint(out, i); out.append(code)
+    put_letters(out, game.bag); put_letters(out, game.racks[1]); put_letters(out, game.racks[2])
+    put_svarint(out, game.scores[1]); put_svarint(out, game.scores[2])
+    out.append(game.current_player); out.append(game.finished)
+    out += RNG_STATE.pack(*game.rng.getstate()[1])
+    put_uvarint(out, game.scoreless)
+    return out
+
+
+def decode_snapshot(buf, info):
+    action_no, pos = get_uvarint(buf, 0)
+    dim = info["board_dim"]
+    game = engine.Game(dim, info["premium_map"], None, seed=info["seed"])
+    n, pos = get_uvarint(buf, pos)
+    for _ in range(n):
+        i, pos = get_uvarint(buf, pos)
+        game.board.place(i // dim, i % dim, ALPHABET[buf[pos] - 1]); pos += 1
+    game.board.commit()
+    game.bag, pos = get_letters(buf, pos)
+    game.racks[1], pos = get_letters(buf, pos)
+    game.racks[2], pos = get_letters(buf, pos)
+    game.scores[1], pos = get_svarint(buf, pos)
+    game.scores[2], pos = get_svarint(buf, pos)
+    game.current_player, game.finished = buf[pos], bool(buf[pos + 1]); pos += 2
+    game.rng.setstate((3, RNG_STATE.unpack_from(buf, pos), None)); pos += RNG_STATE.size
+    # Starsze zapisy nie mają licznika tur bez punktów
+    if pos < len(buf): game.scoreless = get_uvarint(buf, pos)[0]
+    game.state = engine.GameState.capture(game)
+    return action_no, game
+
+
+# --- Zapis ---
+
+class GameRecorder:
+    # Podpinany pod engine.Game (game.recorder); każda akcja jest od razu dopisywana i zapisywana na dysk
+    __slots__ = ("path", "file", "game", "actions", "snapshot_every")
+
+    def __init__(self, path, game, names, snapshot_every=SNAPSHOT_EVERY, resume_actions=None):
+        self.path, self.game, self.snapshot_every = path, game, snapshot_every
+        if resume_actions is None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.file = open(path, "wb")
+            self.file.write(MAGIC)
+            self._write(START, encode_start(game, names))
+            self.actions = 0
+        else:
+            # Dopisywanie za ostatnim pełnym rekordem: urwany ogon (awaria w trakcie zapisu) jest obcinany
+            end = complete_end(path)
+            self.file = open(path, "r+b")
+            self.file.truncate(end); self.file.seek(end)
+            self.actions = resume_actions
+        game.recorder = self
+
+    def _write(self, kind, payload):
+        head = bytearray([kind]); put_uvarint(head, len(payload))
+        self.file.write(head + payload)
+        self.file.flush()
+
+    def _action(self, kind, payload):
+        self._write(kind, payload)
+        self.actions += 1
+        if self.actions % self.snapshot_every == 0: self._write(SNAPSHOT, encode_snapshot(self.game, self.actions))
+
+    def place(self, placed, points):
+        self._action(PLACE, encode_place(placed, points))
+
+    def exchange(self, indices):
+        out = bytearray(); put_uvarint(out, len(indices)); out += bytes(indices)
+        self._action(EXCHANGE, out)
+
+    def pass_turn(self):
+        self._action(PASS, b"")
+
+    def restore(self):
+        self._action(RESTORE, encode_snapshot(self.game, self.actions + 1))
+
+    def end(self, penalties):
+        out = bytearray(); put_svarint(out, penalties[1]); put_svarint(out, penalties[2])
+        self._write(END, out)
+
+    def close(self):
+        if self.game.recorder is self: self.game.recorder = None
+        self.file.close()
+
+
+# --- Odczyt strumieniowy ---
+
+def _read_record(f, with_payload=True):
+    # (typ, dane) kolejnego rekordu albo None na końcu pliku i dla urwanego ostatniego rekordu
+    # (np. awaria w trakcie zapisu); with_payload=False tylko przeskakuje dane
+    head = f.read(1)
+    if not head: return None
+    length = shift = 0
+    while True:
+        b = f.read(1)
+        if not b: return None
+        length |= (b[0] & 0x7F) << shift
+        if b[0] < 0x80: break
+        shift += 7
+    if with_payload:
+        payload = f.read(length)
+        return (head[0], payload) if len(payload) == length else None
+    end = f.tell() + length
+    if end > os.fstat(f.fileno()).st_size: return None
+    f.seek(end)
+    return head[0], None
+
+
+def iter_records(path, with_payload=True, start=None):
+    # Generator (typ, przesunięcie, dane) - czyta plik sekwencyjnie, bez wczytywania całości;
+    # with_payload=False tylko przeskakuje dane (budowa indeksu migawek), start - przesunięcie pierwszego rekordu
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC: raise ValueError(f"{path}: to nie jest zapis partii")
+        if start: f.seek(start)
+        while True:
+            offset = f.tell()
+            record = _read_record(f, with_payload)
+            if record is None: return
+            yield record[0], offset, record[1]
+
+
+def complete_end(path):
+    # Przesunięcie za ostatnim pełnym rekordem
+    with open(path, "rb") as f:
+        f.seek(len(MAGIC))
+        end = f.tell()
+        while _read_record(f, with_payload=False): end = f.tell()
+    return end
+
+
+def apply_action(game, kind, payload, info):
+    if kind == PLACE:
+        ok, text = game.play(decode_place(payload)[1])
+        if not ok: raise ValueError(f"Niepoprawny ruch w zapisie: {text}")
+    elif kind == EXCHANGE:
+        n, pos = get_uvarint(payload, 0)
+        game.exchange(list(payload[pos:pos + n]))
+    elif kind == PASS:
+        game.confirm_move()
+    elif kind == END:
+        game.end_game()
+    elif kind == RESTORE:
+        game.restore(decode_snapshot(payload, info)[1].state)
+
+
+def read_info(path):
+    for kind, _, payload in iter_records(path):
+        if kind != START: break
+        return decode_start(payload)
+    raise ValueError(f"{path}: brak rekordu START")
+
+
+def load(path, upto=None):
+    # Stan partii po akcji nr `upto` (domyślnie ostatniej): skok do najbliższej wcześniejszej migawki
+    # i odtworzenie tylko akcji po niej. Zwraca (game, info, liczba akcji).
+    info = read_info(path)
+    snapshots = [offset for kind, offset, _ in iter_records(path, with_payload=False) if kind == SNAPSHOT]
+    game = engine.Game(info["board_dim"], info["premium_map"], None, seed=info["seed"])
+    actions, start = 0, None
+    with open(path, "rb") as f:
+        for offset in reversed(snapshots):
+            f.seek(offset)
+            payload = _read_at(f)
+            if payload is None: continue
+            if upto is None or get_uvarint(payload, 0)[0] <= upto:
+                actions, game = decode_snapshot(payload, info)
+                start = offset
+                break
+    for kind, offset, payload in iter_records(path, start=start):
+        if kind in (START, SNAPSHOT): continue
+        if upto is not None and actions >= upto: break
+        apply_action(game, kind, payload, info)
+        if kind != END: actions += 1
+    return game, info, actions
+
+
+def _read_at(f):
+    # Dane rekordu od bieżącej pozycji albo None dla urwanego rekordu
+    record = _read_record(f)
+    return record and record[1]
+
+
+def summarize(path):
+    # Podsumowanie partii bez odtwarzania: gracze, punkty ruchów, kary końcowe
+    summary = {"path": path, "moves": 0, "exchanges": 0, "passes": 0, "restores": 0, "points": {1: 0, 2: 0}, "finished": False}
+    player, info = 1, None
+    for kind, _, payload in iter_records(path):
+        if kind == START:
+            info = decode_start(payload); summary["names"] = info["names"]
+        elif kind == PLACE:
+            summary["points"][player] += decode_place(payload)[0]; summary["moves"] += 1
+        elif kind == EXCHANGE: summary["exchanges"] += 1
+        elif kind == PASS: summary["passes"] += 1
+        elif kind == END:
+            p1, pos = get_svarint(payload, 0)
+            p2, _ = get_svarint(payload, pos)
+            summary["points"][1] -= p1; summary["points"][2] -= p2; summary["finished"] = True
+        elif kind == RESTORE:
+            _, game = decode_snapshot(payload, info)
+            summary["points"], player = dict(game.scores), game.current_player; summary["restores"] += 1
+        if kind in (PLACE, EXCHANGE, PASS): player = 2 if player == 1 else 1
+    return summary
+
+
+def resume(path, dic=None):
+    # Wczytuje partię i podpina rejestrator dopisujący do tego samego pliku
+    game, info, actions = load(path)
+    game.dictionary = dic
+    GameRecorder(path, game, info["names"], resume_actions=actions)
+    return game, info
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Zapisy partii (.scrrec)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_sum = sub.add_parser("podsumuj", help="podsumowanie wielu partii (strumieniowo)")
+    p_sum.add_argument("files", nargs="+")
+    p_show = sub.add_parser("pokaz", help="stan planszy po ruchu N")
+    p_show.add_argument("file")
+    p_show.add_argument("--ruch", type=int)
+    args = parser.parse_args()
+    if args.cmd == "podsumuj":
+        total = 0
+        for path in args.files:
+            s = summarize(path)
+            total += 1
+            print(f"{path}: {s['names'][1]} {s['points'][1]} - {s['points'][2]} {s['names'][2]}, "
+                  f"ruchów {s['moves']}, wymian {s['exchanges']}, pasów {s['passes']}{'' if s['finished'] else ' (w toku)'}")
+        print(f"Partii: {total}")
+    else:
+        game, info, n = load(args.file, args.ruch)
+        for r in range(game.board_dim):
+            print(" ".join(game.board.letter_at(r, c) or "." for c in range(game.board_dim)))
+        print(f"Po akcji {n}: {info['names'][1]} {game.scores[1]} - {game.scores[2]} {info['names'][2]}")
@@ -0,0 +1,339 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+import dictionary
+import engine
+import layout
+import leaves
+import record
+
+# Serwer gry: wiele partii w jednym procesie asyncio, zasady liczy wyłącznie serwer (engine.Game).
+# Protokół: linie JSON po TCP (UTF-8, jedna wiadomość w linii).
+#   klient -> serwer: {"t": "join", "name": ..., "room": opcjonalnie, "seed": tylko z --testy}
+#                     {"t": "move", "m": [[r, c, litera], ...]}, {"t": "ex", "i": [indeksy]}, {"t": "pass"},
+#                     {"t": "end"} (poddanie partii), {"t": "stats"}
+#   serwer -> klient: {"t": "wait"}; {"t": "start", ...} raz na partię (układ premii, własny stojak);
+#                     {"t": "d", ...} zmiana po akcji: gracz "p", płytki "m", punkty "pts", liczba wymienionych "x",
+#                     wyniki "s", liczba płytek w worku "bag", następny gracz "n", a wykonującemu także nowy "rack";
+#                     {"t": "err", "msg": ...} tylko do nadawcy; {"t": "end", ...} wyniki, kary, zwycięzca.
+# Każdy gracz widzi tylko swój stojak; plansza przychodzi jako położone płytki, nigdy w całości.
+# Gracze z tym samym "room" grają ze sobą, bez "room" - z pierwszym czekającym. Po "end" połączenie może dołączyć ponownie.
+DEFAULT_PORT = 8765
+MAX_LINE = 1 << 16
+MAX_BUFFER = 1 << 20    # niewysłane bajty do klienta, który nie odbiera - powyżej połączenie jest zrywane
+
+
+def encode(msg):
+    return json.dumps(msg, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+
+def raise_open_files():
+    # Tysiące połączeń (test obciążenia) - podniesienie miękkiego limitu deskryptorów do twardego
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard: resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def check_tiles(game, tiles):
+    # Dane od klienta sprawdzone, zanim dotkną stanu gry; None = można grać
+    if not isinstance(tiles, list) or not 0 < len(tiles) <= engine.RACK_SIZE: return "Niepoprawny ruch"
+    rack, cells, dim = list(game.rack), set(), game.board_dim
+    for t in tiles:
+        if not isinstance(t, list) or len(t) != 3: return "Niepoprawny ruch"
+        r, c, l = t
+        if type(r) is not int or type(c) is not int or not (0 <= r < dim and 0 <= c < dim): return "Pole poza planszą"
+        if (r, c) in cells or game.board.letter_at(r, c): return "Pole zajęte"
+        if l not in rack: return f"Brak litery {l} na stojaku"
+        rack.remove(l); cells.add((r, c))
+    return None
+
+
+class Player:
+    __slots__ = ("writer", "name", "room", "seat", "waiting")
+
+    def __init__(self, writer):
+        self.writer, self.name, self.room, self.seat, self.waiting = writer, "", None, 0, None
+
+    def send(self, msg):
+        # Serwer czeka (drain) tylko na nadawcę akcji, więc bufor przeciwnika, który nie odbiera, jest ograniczony tu
+        if self.writer.is_closing(): return
+        self.writer.write(encode(msg))
+        if self.writer.transport.get_write_buffer_size() > MAX_BUFFER: self.writer.transport.abort()
+
+    def error(self, text):
+        self.send({"t": "err", "msg": text})
+
+
+class Room:
+    __slots__ = ("id", "game", "players")
+
+    def __init__(self, room_id, game, players):
+        self.id, self.game, self.players = room_id, game, players
+
+
+class GameServer:
+    __slots__ = ("dic", "board_dim", "premium_map", "premium_list", "test_seeds", "record_dir",
+                 "rooms", "waiting", "ids", "connections", "actions")
+
+    def __init__(self, dic, board_dim, premium_map, test_seeds=False, record_dir=None):
+        self.dic, self.board_dim, self.premium_map = dic, board_dim, premium_map
+        self.premium_list = [[r, c, kind, mult] for (r, c), (kind, mult, _) in sorted(premium_map.items())]
+        self.test_seeds, self.record_dir = test_seeds, record_dir
+        self.rooms, self.waiting, self.ids = {}, {}, itertools.count(1)
+        self.connections = self.actions = 0
+
+    async def handle(self, reader, writer):
+        player = Player(writer)
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                try:
+                    msg = json.loads(line)
+                    HANDLERS[msg["t"]](self, player, msg)
+                except (ValueError, KeyError, TypeError, IndexError, AttributeError):
+                    player.error("Niepoprawny komunikat")
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass  # zerwane połączenie albo zbyt długa linia
+        finally:
+            self.connections -= 1
+            self.leave(player)
+            writer.close()
+
+    def leave(self, player):
+        if player.waiting is not None and self.waiting.get(player.waiting[0]) is player: del self.waiting[player.waiting[0]]
+        room = player.room
+        if room:
+            player.room = None
+            self.finish(room, f"Rozłączył się {player.name}", winner=3 - player.seat)
+
+    def on_join(self, player, msg):
+        if player.room or player.waiting: player.error("Już w grze"); return
+        player.name = str(msg.get("name") or "Gracz")[:30]
+        key = msg.get("room")
+        if key is not None: key = str(key)[:64]
+        seed = msg.get("seed") if self.test_seeds and type(msg.get("seed")) is int else None
+        other = self.waiting.pop(key, None)
+        if other is None:
+            player.waiting = (key, seed)
+            self.waiting[key] = player
+            player.send({"t": "wait"}); return
+        self.start(other, player, other.waiting[1])
+
+    def start(self, first, second, seed):
+        game = engine.Game(self.board_dim, self.premium_map, self.dic, seed=seed)
+        room = Room(next(self.ids), game, {1: first, 2: second})
+        self.rooms[room.id] = room
+        if self.record_dir:
+            record.GameRecorder(os.path.join(self.record_dir, f"gra_{room.id}.scrrec"), game, {1: first.name, 2: second.name})
+        base = {"t": "start", "g": room.id, "names": [first.name, second.name], "dim": self.board_dim,
+                "prem": self.premium_list, "bag": len(game.bag), "turn": game.current_player}
+        for seat, p in room.players.items():
+            p.room, p.seat, p.waiting = room, seat, None
+            p.send({**base, "you": seat, "rack": game.racks[seat]})
+
+    def turn(self, player):
+        room = player.room
+        if not room: player.error("Brak partii"); return None
+        if room.game.current_player != player.seat: player.error("Nie twoja kolej"); return None
+        return room
+
+    def broadcast(self, room, seat, delta):
+        # Ta sama zmiana do obu graczy; tylko wykonujący akcję dostaje swój nowy stojak
+        game = room.game
+        delta.update(s=[game.scores[1], game.scores[2]], bag=len(game.bag), n=game.current_player)
+        self.actions += 1
+        for p_seat, p in room.players.items():
+            p.send({**delta, "rack": game.racks[seat]} if p_seat == seat else delta)
+
+    def on_move(self, player, msg):
+        room = self.turn(player)
+        if not room: return
+        game, tiles, seat = room.game, msg.get("m"), player.seat
+        reason = check_tiles(game, tiles)
+        if reason: player.error(reason); return
+        before = game.scores[seat]
+        ok, text = game.play([tuple(t) for t in tiles])
+        if not ok: player.error(text or "Ruch bez punktów"); return
+        self.broadcast(room, seat, {"t": "d", "p": seat, "m": tiles, "pts": game.scores[seat] - before})
+        if game.finished: self.finish(room, f"{player.name} wyłożył wszystkie litery")
+
+    def on_exchange(self, player, msg):
+        room = self.turn(player)
+        if not room: return
+        game, indices = room.game, msg.get("i")
+        if (not isinstance(indices, list) or not indices
+                or any(type(i) is not int or not 0 <= i < len(game.rack) for i in indices)
+                or len(set(indices)) != len(indices)):
+            player.error("Niepoprawna wymiana"); return
+        if not game.exchange(indices): player.error("Za mało w worku!"); return
+        self.broadcast(room, player.seat, {"t": "d", "p": player.seat, "x": len(indices)})
+        self.scoreless(room)
+
+    def on_pass(self, player, msg):
+        room = self.turn(player)
+        if not room: return
+        room.game.confirm_move()
+        self.broadcast(room, player.seat, {"t": "d", "p": player.seat})
+        self.scoreless(room)
+
+    def scoreless(self, room):
+        # Wymiana albo pas; silnik sam kończy partię po MAX_SCORELESS_TURNS takich turach z rzędu
+        if room.game.finished: self.finish(room, "Zbyt wiele tur bez punktów")
+
+    def on_end(self, player, msg):
+        # Zakończenie na żądanie to poddanie partii - inaczej prowadzący mógłby skończyć ją w dowolnej chwili
+        if not player.room: player.error("Brak partii"); return
+        self.finish(player.room, f"Poddał się {player.name}", winner=3 - player.seat)
+
+    def on_stats(self, player, msg):
+        player.send({"t": "stats", "games": len(self.rooms), "waiting": len(self.waiting), "conns": self.connections,
+                     "actions": self.actions, "cpu": time.process_time()})
+
+    def finish(self, room, why, winner=None):
+        # Kary za litery na stojakach jak w engine.end_game; walkower (winner) przy rozłączeniu i poddaniu
+        game = room.game
+        penalties = [game.rack_penalty(1), game.rack_penalty(2)]
+        result = game.end_game()
+        msg = {"t": "end", "s": [game.scores[1], game.scores[2]], "pen": penalties,
+               "w": result if winner is None else winner, "why": why}
+        for p in room.players.values():
+            if p.room is room: p.room = None; p.send(msg)
+        if game.recorder: game.recorder.close()
+        del self.rooms[room.id]
+
+
+HANDLERS = {"join": GameServer.on_join, "move": GameServer.on_move, "ex": GameServer.on_exchange,
+            "pass": GameServer.on_pass, "end": GameServer.on_end, "stats": GameServer.on_stats}
+
+
+# --- Klient: lustro partii i bot ---
+
+def mirror_game(msg, dic=None):
+    # Partia po stronie klienta z komunikatu "start": plansza i wyniki jak na serwerze, własny stojak,
+    # stojak przeciwnika pusty, a worek tylko o właściwej liczbie płytek (zawartość zna serwer)
+    premium_map = {(r, c): layout.premium(kind, mult) for r, c, kind, mult in msg["prem"]}
+    game = engine.Game(msg["dim"], premium_map, dic)
+    you = msg["you"]
+    game.racks = {you: list(msg["rack"]), 3 - you: []}
+    game.bag = [""] * msg["bag"]
+    game.current_player = msg["turn"]
+    game.state = engine.GameState.capture(game)
+    return game
+
+
+def apply_delta(game, msg, you):
+    # Zmiana "d" od serwera; niezatwierdzone płytki gracza wracają na stojak przed nadpisaniem go
+    game.return_tiles()
+    placed = [tuple(t) for t in msg.get("m", ())]
+    for r, c, l in placed: game.board.place(r, c, l)
+    if placed:
+        game.board.commit()
+        if game.movegen: game.movegen.update(placed)
+    if "rack" in msg: game.racks[you] = list(msg["rack"])
+    game.scores = {1: msg["s"][0], 2: msg["s"][1]}
+    game.bag = [""] * msg["bag"]
+    game.current_player = msg["n"]
+    game.state = engine.GameState.capture(game)
+
+
+class Connection:
+    # Połączenie klienta asyncio (bot, test obciążenia)
+    __slots__ = ("reader", "writer")
+
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+
+    @classmethod
+    async def open(cls, host, port):
+        return cls(*await asyncio.open_connection(host, port, limit=MAX_LINE))
+
+    def send(self, msg):
+        self.writer.write(encode(msg))
+
+    async def recv(self):
+        line = await self.reader.readline()
+        if not line: raise ConnectionError("Serwer zamknął połączenie")
+        return json.loads(line)
+
+    def close(self):
+        self.writer.close()
+
+
+async def run_bot(host, port, dic, name, room, games):
+    # Gracz komputerowy przez sieć: ruchy z generatora na lustrze partii (jak komputer w main.py)
+    conn = await Connection.open(host, port)
+    played = 0
+    while not games or played < games:
+        conn.send({"t": "join", "name": name, "room": room})
+        game = you = None
+        while True:
+            msg = await conn.recv()
+            if msg["t"] == "start": game, you = mirror_game(msg, dic), msg["you"]
+            elif msg["t"] == "d": apply_delta(game, msg, you)
+            elif msg["t"] == "err": conn.send({"t": "pass"}); continue  # np. inny słownik niż na serwerze
+            elif msg["t"] == "end":
+                print(f"{msg['why']}: {msg['s'][0]} - {msg['s'][1]}"); break
+            else: continue
+            if game.current_player == you:
+                moves = game.moves()
+                best = leaves.policy(game, moves, None) if moves else None
+                if best: conn.send({"t": "move", "m": best[1]})
+                elif len(game.bag) >= engine.RACK_SIZE: conn.send({"t": "ex", "i": list(range(len(game.rack)))})
+                else: conn.send({"t": "pass"})
+        played += 1
+    conn.close()
+
+
+async def serve(args):
+    board_dim, premium_map, dic = engine.load_setup(args.layout, args.dictionary)
+    if not dic: print(f"Brak słownika {args.dictionary} - słowa nie będą sprawdzane")
+    gs = GameServer(dic, board_dim, premium_map, args.testy, args.zapis)
+    srv = await asyncio.start_server(gs.handle, args.host, args.port, limit=MAX_LINE, backlog=4096)
+    print(f"Serwer gry na {args.host}:{args.port} (plansza {board_dim}x{board_dim})", flush=True)
+    async with srv:
+        await srv.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serwer gry sieciowej")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_srv = sub.add_parser("start", help="uruchom serwer")
+    p_srv.add_argument("--host", default="127.0.0.1")
+    p_srv.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p_srv.add_argument("--layout", default="plansza.ods")
+    p_srv.add_argument("--dictionary", default="slowa.dawg")
+    p_srv.add_argument("--zapis", metavar="KATALOG", help="zapisuj partie (.scrrec) do katalogu")
+    p_srv.add_argument("--testy", action="store_true", help="klient może podać ziarno partii (test obciążenia)")
+    p_bot = sub.add_parser("bot", help="gracz komputerowy łączący się z serwerem")
+    p_bot.add_argument("--host", default="127.0.0.1")
+    p_bot.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p_bot.add_argument("--dictionary", default="slowa.dawg")
+    p_bot.add_argument("--nazwa", default="Komputer")
+    p_bot.add_argument("--pokoj", help="graj z tym, kto poda ten sam pokój")
+    p_bot.add_argument("--partie", type=int, default=1, help="liczba partii (0 = bez końca)")
+    args = parser.parse_args(argv)
+
+    raise_open_files()
+    try:
+        if args.cmd == "start": asyncio.run(serve(args))
+        else:
+            dic = dictionary.load(args.dictionary)
+            if not dic: print(f"Brak słownika {args.dictionary} - bot wymaga pliku .dawg"); return 1
+            asyncio.run(run_bot(args.host, args.port, dic, args.nazwa, args.pokoj, args.partie))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
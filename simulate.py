@@ -0,0 +1,112 @@
+import argparse
+import importlib
+import json
+import multiprocessing
+import random
+import sys
+import time
+import dictionary
+import engine
+
+# Symulacja gier komputer-komputer na zadanym układzie premii.
+# Każda gra ma własne ziarno (seed + numer gry), więc wynik nie zależy od liczby procesów.
+
+
+def policy_best(game, moves, rng):
+    return moves[0]
+
+
+def policy_random(game, moves, rng):
+    return rng.choice(moves)
+
+
+POLICIES = {"best": policy_best, "random": policy_random}
+
+
+def resolve_policy(name):
+    # "best", "random" albo "moduł:funkcja" z sygnaturą (game, moves, rng) -> (punkty, płytki) | None
+    if name in POLICIES: return POLICIES[name]
+    module, _, func = name.partition(":")
+    return getattr(importlib.import_module(module), func)
+
+
+def play_game(board_dim, premium_map, dic, policies, seed):
+    game = engine.Game(board_dim, premium_map, dic, seed=seed)
+    rng = random.Random(seed)
+    stats = {"seed": seed, "turns": 0, "moves": 0, "exchanges": 0, "passes": 0, "bingos": {1: 0, 2: 0}}
+    while not game.finished and stats["turns"] < engine.MAX_TURNS:
+        stats["turns"] += 1
+        player = game.current_player
+        moves = game.moves()
+        choice = policies[player](game, moves, rng) if moves else None
+        if choice:
+            game.play(choice[1])
+            stats["moves"] += 1
+            if len(choice[1]) == engine.RACK_SIZE: stats["bingos"][player] += 1
+        else:
+            if game.exchange(range(len(game.rack))): stats["exchanges"] += 1
+            else: game.confirm_move(); stats["passes"] += 1
+    winner = game.end_game()
+    stats.update(scores=game.scores, winner=winner)
+    return stats
+
+
+_worker = {}
+
+
+def init_worker(layout_path, dict_path, policy_names):
+    _worker["setup"] = engine.load_setup(layout_path, dict_path)
+    _worker["policies"] = {1: resolve_policy(policy_names[0]), 2: resolve_policy(policy_names[1])}
+
+
+def run_one(seed):
+    t0 = time.perf_counter()
+    stats = play_game(*_worker["setup"], _worker["policies"], seed)
+    stats["seconds"] = round(time.perf_counter() - t0, 4)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Symulacja gier komputer-komputer")
+    parser.add_argument("--layout", default="plansza.ods", help="plik .ods lub .layout z premiami")
+    parser.add_argument("--dictionary", default="slowa.dawg")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", nargs="+", default=["best"], help="polityka dla obu graczy lub osobno dla gracza 1 i 2")
+    parser.add_argument("--out", default="symulacja.jsonl")
+    args = parser.parse_args(argv)
+
+    if not dictionary.load(args.dictionary):
+        print(f"Brak słownika {args.dictionary} - symulacja wymaga pliku .dawg"); return 1
+    policy_names = (args.policy * 2)[:2]
+    init_args = (args.layout, args.dictionary, policy_names)
+    seeds = [args.seed + i for i in range(args.games)]
+
+    t0 = time.perf_counter()
+    total_moves = 0
+    with open(args.out, "w", encoding="utf-8") as out:
+        if args.workers > 1:
+            pool = multiprocessing.Pool(args.workers, initializer=init_worker, initargs=init_args)
+            results = pool.imap_unordered(run_one, seeds, chunksize=max(1, args.games // (args.workers * 8)))
+        else:
+            pool = None
+            init_worker(*init_args)
+            results = map(run_one, seeds)
+        try:
+            for n, stats in enumerate(results, 1):
+                out.write(json.dumps(stats) + "\n")
+                total_moves += stats["moves"]
+                if n % 100 == 0 or n == args.games:
+                    dt = time.perf_counter() - t0
+                    print(f"{n}/{args.games} gier, {n / dt:.1f} gier/s, {total_moves / dt:.0f} ruchów/s", file=sys.stderr)
+        finally:
+            if pool: pool.close(); pool.join()
+    dt = time.perf_counter() - t0
+    print(f"Zapisano {args.out}: {args.games} gier w {dt:.1f} s na {args.workers} procesach "
+          f"({args.games / dt:.2f} gier/s, {total_moves / dt:.0f} ruchów/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
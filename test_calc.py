@@ -0,0 +1,57 @@
+import random
+import pytest
+import calc
+from letters import LETTERS, ALPHABET
+
+
+def random_premiums(rng, dim):
+    kinds = [("L", 2), ("L", 3), ("S", 2), ("S", 3)]
+    return {(r, c): (*rng.choice(kinds), None) for r in range(dim) for c in range(dim) if rng.random() < 0.15}
+
+
+def random_position(rng, dim):
+    # Stare płytki rozsiane po planszy i nowe płytki w jednej linii (z przerwami na stare), więc ruch
+    # tworzy słowo główne i słowa poprzeczne; czasem płytki rozrzucone dowolnie
+    board = [[None] * dim for _ in range(dim)]
+    for _ in range(rng.randint(0, dim * dim // 3)):
+        board[rng.randrange(dim)][rng.randrange(dim)] = {"letter": rng.choice(ALPHABET), "new": False}
+    placed = []
+    if rng.random() < 0.8:
+        dr, dc = rng.choice([(0, 1), (1, 0)])
+        r, c, n = rng.randrange(dim), rng.randrange(dim), rng.randint(1, 7)
+        while len(placed) < n and r < dim and c < dim:
+            if board[r][c] is None: placed.append((r, c, rng.choice(ALPHABET)))
+            r, c = r + dr, c + dc
+    else:
+        for _ in range(rng.randint(1, 7)):
+            r, c = rng.randrange(dim), rng.randrange(dim)
+            if board[r][c] is None and (r, c) not in {(t[0], t[1]) for t in placed}: placed.append((r, c, rng.choice(ALPHABET)))
+    rng.shuffle(placed)
+    for r, c, l in placed: board[r][c] = {"letter": l, "new": True}
+    return board, placed
+
+
+@pytest.mark.parametrize("dim", [15, 25])
+def test_move_score_matches_full_score(dim):
+    rng = random.Random(dim)
+    for _ in range(500):
+        premium_map = random_premiums(rng, dim)
+        board, placed = random_position(rng, dim)
+        full = calc.calculate_full_score(board, premium_map, dim, LETTERS)
+        move = calc.calculate_move_score(calc.board_view(board), placed, premium_map, dim, LETTERS)
+        assert move == full
+        assert calc.move_points(calc.board_view(board), placed, premium_map, dim, LETTERS) == full[0]
+
+
+def test_cross_words_and_bingo():
+    # AB poziomo na starym K w kolumnie: słowo główne + poprzeczne, premie tylko na nowych płytkach
+    dim = 15
+    board = [[None] * dim for _ in range(dim)]
+    board[6][7] = {"letter": "K", "new": False}
+    placed = [(7, 7, "A"), (7, 8, "B")]
+    for r, c, l in placed: board[r][c] = {"letter": l, "new": True}
+    premium_map = {(7, 7): ("S", 2, None), (6, 7): ("L", 3, None)}
+    pts, math = calc.calculate_move_score(calc.board_view(board), placed, premium_map, dim, LETTERS)
+    assert (pts, math) == calc.calculate_full_score(board, premium_map, dim, LETTERS)
+    assert pts == (1 + 3) * 2 + (2 + 1) * 2  # AB x2 + KA x2 (K na premii, ale stare)
+    assert math.count("|") == 1
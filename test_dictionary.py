@@ -0,0 +1,36 @@
+import random
+import dictionary
+from letters import ALPHABET
+
+
+def test_membership_matches_word_list(tmp_path):
+    rng = random.Random(2)
+    letters = ALPHABET[:12] + ["Ą", "Ę", "Ł", "Ó", "Ś", "Ż"]
+    words = {"".join(rng.choice(letters) for _ in range(rng.randint(1, 8))) for _ in range(5000)}
+    src, dst = tmp_path / "slowa.txt", str(tmp_path / "slowa.dawg")
+    # Małe litery są zamieniane na wielkie, słowa ze znakami spoza alfabetu gry pomijane
+    src.write_text("\n".join([w.lower() for w in sorted(words)] + ["", "QUIZ", "X-RAY"]), encoding="utf-8")
+    n, skipped, _ = dictionary.compile_wordlist(str(src), dst)
+    assert (n, skipped) == (len(words), 2)
+    dic = dictionary.load(dst)
+    for w in words: assert w in dic
+    # Przedrostki, przedłużenia i losowe ciągi z tych samych liter - zgodnie z listą
+    candidates = {w[:-1] for w in words} | {w + rng.choice(letters) for w in words}
+    candidates |= {"".join(rng.choice(letters) for _ in range(rng.randint(1, 8))) for _ in range(20000)}
+    for w in candidates: assert (w in dic) == (w in words), w
+    for w in ("", "QUIZ", "A1", "a"): assert w not in dic
+    dic.close()
+
+
+def test_corrupt_file_is_rejected(tmp_path):
+    src, good = tmp_path / "slowa.txt", tmp_path / "slowa.dawg"
+    src.write_text("KOT\nKOTY\nLAS\n", encoding="utf-8")
+    dictionary.compile_wordlist(str(src), str(good))
+    data = good.read_bytes()
+    bad = {"pusty": b"", "krotki": data[:5], "magia": b"X" + data[1:], "wersja": data[:7] + b"\x09" + data[8:],
+           "urwany": data[:-4], "dluzszy": data + b"\0\0\0\0"}
+    for name, content in bad.items():
+        path = tmp_path / f"{name}.dawg"
+        path.write_bytes(content)
+        assert dictionary.load(str(path)) is None, name
+    assert "KOTY" in dictionary.load(str(good))
@@ -0,0 +1,71 @@
+import random
+import pytest
+import endgame
+import engine
+import movegen
+from conftest import WORD_LETTERS
+
+
+def penalty(rack):
+    return sum(endgame.PENALTY[l] for l in rack)
+
+
+def brute_value(game, passed=False):
+    # Pełny minimaks bez cięć i tablicy transpozycji, na kopiach gry
+    me, opp = game.current_player, 3 - game.current_player
+    if passed: best = penalty(game.racks[opp]) - penalty(game.racks[me])
+    else:
+        after = game.copy(); after.next_turn()
+        best = -brute_value(after, True)
+    for pts, placed in movegen.MoveGenerator(game.board, game.dictionary, game.premium_map).generate(game.racks[me]):
+        after = game.copy()
+        for r, c, l in placed: after.racks[me].remove(l); after.board.place(r, c, l)
+        after.board.commit(); after.next_turn()
+        best = max(best, pts + penalty(after.racks[opp]) if not after.racks[me] else pts - brute_value(after))
+    return best
+
+
+def endgame_position(dic, seed):
+    # Pusty worek, kilka ruchów na planszy 9x9 i po 1-2 litery na stojakach
+    rng = random.Random(seed)
+    game = engine.Game(9, {(4, 4): ("S", 2, None), (2, 2): ("L", 3, None), (6, 3): ("S", 3, None)}, dic, seed=seed)
+    game.bag = []
+    game.racks = {p: [rng.choice(WORD_LETTERS) for _ in range(engine.RACK_SIZE)] for p in (1, 2)}
+    for _ in range(4):
+        best = game.best_move()
+        if best: game.play(best[1])
+        else: game.confirm_move()
+        if min(len(game.racks[1]), len(game.racks[2])) <= 3: break
+    for p in (1, 2):
+        del game.racks[p][rng.randint(1, 2):]
+        if not game.racks[p]: return None
+    game.movegen = None
+    return game
+
+
+def test_solver_matches_brute_force(small_dic):
+    checked = 0
+    for seed in range(20):
+        game = endgame_position(small_dic, seed)
+        if not game or game.board.is_empty(): continue
+        res = endgame.EndgameSolver(game, memory_mb=1).solve()
+        assert res["value"] == brute_value(game), seed
+        # Sekwencja odtworzona w grze daje obliczone wyniki końcowe
+        replay = game.copy()
+        for p, pts, placed in res["sequence"]:
+            assert replay.current_player == p
+            if placed: assert replay.play(placed)[0]
+            else: replay.confirm_move()
+        replay.end_game()
+        assert replay.scores == res["final_scores"]
+        checked += 1
+    assert checked >= 10
+
+
+@pytest.mark.parametrize("seed", [1, 4])
+def test_parallel_root_split_matches_sequential(small_dic, seed):
+    game = endgame_position(small_dic, seed)
+    sequential = endgame.EndgameSolver(game, memory_mb=1).solve()
+    parallel = endgame.EndgameSolver(game, memory_mb=1).solve(workers=2)
+    assert parallel["value"] == sequential["value"]
+    assert parallel["spread"] == sequential["spread"]
@@ -0,0 +1,150 @@
+import random
+import engine
+from letters import ALPHABET
+
+LINE = "Litery muszą leżeć w jednym wierszu lub kolumnie"
+GAP = "Litery muszą tworzyć ciągłe słowo (bez przerw)"
+CENTRE = "Pierwszy ruch musi przechodzić przez środek planszy"
+ISOLATED = "Słowo musi łączyć się z literami na planszy"
+
+
+def naive_placement(game):
+    # Te same zasady sprawdzane wprost na siatce liter
+    placed, letter_at, dim = game.placed, game.board.letter_at, game.board_dim
+    if not placed: return None
+    new = {(r, c) for r, c, _ in placed}
+    rows, cols = {r for r, _ in new}, {c for _, c in new}
+    if len(rows) > 1 and len(cols) > 1: return LINE
+    if len(rows) == 1: span = [(min(rows), c) for c in range(min(cols), max(cols) + 1)]
+    else: span = [(r, min(cols)) for r in range(min(rows), max(rows) + 1)]
+    if any(not letter_at(r, c) for r, c in span): return GAP
+    old = {(r, c) for r in range(dim) for c in range(dim) if letter_at(r, c)} - new
+    if not old: return None if (dim // 2, dim // 2) in new else CENTRE
+    near = {(r + dr, c + dc) for r, c in span for dr, dc in ((0, 0), (1, 0), (-1, 0), (0, 1), (0, -1))}
+    return None if near & old else ISOLATED
+
+
+def random_placement(rng):
+    dim = rng.randint(5, 15)
+    game = engine.Game(dim, seed=0)
+    if rng.random() < 0.8:
+        for _ in range(rng.randint(1, dim * dim // 4)):
+            game.board.place(rng.randrange(dim), rng.randrange(dim), rng.choice(ALPHABET))
+        game.board.commit()
+    cells = set()
+    if rng.random() < 0.8:
+        # Płytki w jednym wierszu albo kolumnie, w oknie kilku pól (czasem z przerwą)
+        r, c = rng.randrange(dim), rng.randrange(dim)
+        vertical = rng.random() < 0.5
+        for _ in range(rng.randint(1, 5)):
+            k = rng.randint(0, 5)
+            cells.add((min(dim - 1, r + k), c) if vertical else (r, min(dim - 1, c + k)))
+    else:
+        for _ in range(rng.randint(1, 4)): cells.add((rng.randrange(dim), rng.randrange(dim)))
+    for r, c in cells: game.place(r, c, rng.choice(ALPHABET))
+    return game
+
+
+def test_check_placement_matches_naive_rules():
+    rng = random.Random(11)
+    seen = set()
+    for _ in range(5000):
+        game = random_placement(rng)
+        reason = game.check_placement()
+        assert reason == naive_placement(game), (game.board_dim, game.placed, reason)
+        seen.add(reason)
+    assert seen == {None, LINE, GAP, CENTRE, ISOLATED}
+
+
+def state_fields(state):
+    return (state.rows, state.racks, state.bag[:state.bag_size], state.scores, state.current_player, state.finished,
+            state.rng_state, state.scoreless)
+
+
+def random_actions(game, rng, n):
+    # Ruchy z generatora, wymiany i pasy; zwraca listę akcji do powtórzenia
+    actions = []
+    for _ in range(n):
+        moves, roll = game.moves(), rng.random()
+        if moves and roll < 0.6: action = ("play", moves[rng.randrange(min(3, len(moves)))][1])
+        elif len(game.bag) >= engine.RACK_SIZE and roll < 0.8: action = ("exchange", rng.sample(range(len(game.rack)), 2))
+        else: action = ("pass", None)
+        apply_action(game, action)
+        actions.append(action)
+    return actions
+
+
+def apply_action(game, action):
+    kind, arg = action
+    if kind == "play": assert game.play(arg)[0]
+    elif kind == "exchange": assert game.exchange(arg)
+    else: game.confirm_move()
+
+
+def test_incremental_state_matches_capture(small_dic):
+    rng = random.Random(5)
+    game = engine.Game(15, {(7, 7): ("S", 2, None)}, small_dic, seed=5)
+    for _ in range(40):
+        before = game.state
+        action = random_actions(game, rng, 1)[0]
+        assert state_fields(game.state) == state_fields(engine.GameState.capture(game))
+        if action[0] == "play":
+            # Ruch liczony na samej migawce daje ten sam stan co pełna gra (poza ziarnem - bez tasowania)
+            pts = game.scores[before.current_player] - before.scores[before.current_player - 1]
+            assert state_fields(before.play(action[1], pts))[:5] == state_fields(game.state)[:5]
+        elif action[0] == "pass":
+            assert state_fields(before.pass_turn()) == state_fields(game.state)
+
+
+def test_restore_undo_redo(small_dic):
+    rng = random.Random(8)
+    game = engine.Game(15, {}, small_dic, seed=8)
+    states = [game.state]
+    actions = random_actions(game, rng, 30)
+    replay = engine.Game(15, {}, small_dic, seed=8)
+    for action in actions:
+        apply_action(replay, action); states.append(replay.state)
+    assert state_fields(replay.state) == state_fields(game.state)
+    for k in (25, 3, 0, 30, 12):
+        # Cofnięcie albo ponowienie do migawki k, potem te same akcje dają te same stany
+        game.restore(states[k])
+        assert state_fields(engine.GameState.capture(game)) == state_fields(states[k])
+        assert game.board.count == sum(1 for row in states[k].rows for code in row if code)
+        for i, action in enumerate(actions[k:k + 5], k + 1):
+            apply_action(game, action)
+            assert state_fields(game.state) == state_fields(states[i])
+
+
+def test_finished_game_rejects_actions(small_dic):
+    game = engine.Game(15, {}, small_dic, seed=3)
+    game.play(game.best_move()[1])
+    winner = game.end_game()
+    scores, state = dict(game.scores), game.state
+    assert game.end_game() == winner and game.scores == scores
+    assert game.confirm_move()[0] is False
+    assert game.exchange([0]) is False
+    assert game.current_player == state.current_player and game.state is state
+
+
+def test_game_ends_by_itself(small_dic):
+    # Tury bez punktów (pasy i wymiany) z rzędu kończą partię; ruch za punkty zeruje licznik
+    game = engine.Game(15, {}, small_dic, seed=4)
+    game.confirm_move(); game.confirm_move()
+    game.play(game.best_move()[1])
+    for i in range(engine.MAX_SCORELESS_TURNS - 1):
+        if i % 2: game.exchange([0, 1])
+        else: game.confirm_move()
+    assert not game.finished and game.scoreless == engine.MAX_SCORELESS_TURNS - 1
+    before = game.state
+    game.confirm_move()
+    assert game.finished and game.state.finished
+    game.restore(before)
+    assert not game.finished and game.scoreless == engine.MAX_SCORELESS_TURNS - 1
+    # Ostatnia płytka przy pustym worku: koniec partii i kara tylko dla przeciwnika
+    pts, placed = game.best_move()
+    p = game.current_player
+    game.bag, game.racks[p] = [], [l for _, _, l in placed]
+    scores = dict(game.scores)
+    game.play(placed)
+    assert game.finished and game.scoreless == 0
+    assert game.scores == {p: scores[p] + pts, 3 - p: scores[3 - p] - game.rack_penalty(3 - p)}
@@ -0,0 +1,70 @@
+import itertools
+import json
+import random
+import leaves
+from letters import LETTERS, ALPHABET
+
+
+def test_key_ignores_order_and_decodes_to_counts():
+    rng = random.Random(4)
+    bag = [l for l, (count, _) in LETTERS.items() for _ in range(count)]
+    for _ in range(2000):
+        letters = rng.sample(bag, rng.randint(0, leaves.MAX_LEAVE))
+        key = leaves.leave_key(letters)
+        assert key == leaves.leave_key(sorted(letters, reverse=True))
+        assert leaves.decode_key(key) == [letters.count(l) for l in ALPHABET]
+
+
+def test_table_parts_cover_possible_leaves():
+    # Klucze części = leave_key wszystkich zostawek do 3 liter dozwolonych rozkładem LETTERS (bez powtórzeń)
+    single = {(code, k): code + k / 10 for code in range(len(ALPHABET)) for k in range(leaves.MAX_LEAVE)}
+    pair = {(a, b): 0.01 for a, b in itertools.combinations(range(len(ALPHABET)), 2)}
+    for size in (1, 2, 3):
+        got, n = {}, 0
+        for first in range(len(ALPHABET)):
+            keys, values = leaves._table_part((size, first, single, pair))
+            got.update(zip(keys, values)); n += len(keys)
+        assert n == len(got)
+        expected = {}
+        for letters in itertools.combinations_with_replacement(ALPHABET, size):
+            counts = [letters.count(l) for l in ALPHABET]
+            if any(c > LETTERS[l][0] for l, c in zip(ALPHABET, counts)): continue
+            v = sum(single[(code, k)] for code, c in enumerate(counts) for k in range(c))
+            v += 0.01 * (sum(1 for c in counts if c) * (sum(1 for c in counts if c) - 1) // 2)
+            expected[leaves.leave_key(letters)] = round(v * leaves.SCALE)
+        assert got == expected, size
+
+
+def test_written_table_round_trip(tmp_path):
+    rng = random.Random(9)
+    keys = rng.sample(range(1, 1 << 40), 500)
+    values = [rng.randint(-32768, 32767) for _ in keys]
+    path = str(tmp_path / "zostawki.tbl")
+    leaves.write_table(path, keys, values)
+    table = leaves.load(path)
+    assert len(table) == len(keys) and table.by_key(0) == 0.0
+    for k, v in zip(keys, values): assert table.by_key(k) == v / leaves.SCALE
+    assert table.by_key(max(keys) + 1) == 0.0
+    table.close()
+    data = open(path, "rb").read()
+    for content in (b"", data[:5], data[:-2], b"X" + data[1:]):
+        with open(path, "wb") as f: f.write(content)
+        assert leaves.load(path) is None
+
+
+def test_resume_from_checkpoint_matches_full_run(tmp_path, small_dic, monkeypatch):
+    # Połowa gier, potem wznowienie z więcej grami: klucze stats z JSON (napisy) łączą się z nowymi liczbami.
+    # Tabela tylko do 2 liter, żeby budowa trwała chwilę
+    monkeypatch.setattr(leaves, "MAX_LEAVE", 2)
+    def build(out, games, *extra):
+        argv = ["--layout", "", "--dictionary", small_dic.path, "--games", str(games), "--chunk", "2",
+                "--workers", "1", "--out", str(out), *extra]
+        assert leaves.main(argv) == 0
+        with open(str(out) + ".stan", encoding="utf-8") as f: return json.load(f)
+
+    build(tmp_path / "a.tbl", 4)
+    resumed = build(tmp_path / "a.tbl", 8)
+    full = build(tmp_path / "b.tbl", 8, "--restart")
+    assert resumed["done"] == full["done"] == [0, 1, 2, 3]
+    assert resumed["stats"] == full["stats"]
+    assert len(leaves.load(str(tmp_path / "a.tbl"))) == len(leaves.load(str(tmp_path / "b.tbl")))
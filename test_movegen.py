@@ -0,0 +1,42 @@
+import itertools
+import random
+import engine
+from conftest import WORD_LETTERS
+
+
+def brute_moves(game):
+    # Wszystkie układy stojaka w jednej linii (z pominięciem zajętych pól) sprawdzone przez confirm_move
+    dim, rack, found = game.board_dim, game.rack[:], {}
+    first = game.board.is_empty()
+    for dr, dc in ((0, 1), (1, 0)):
+        for r0 in range(dim):
+            for c0 in range(dim):
+                if game.board.letter_at(r0, c0): continue
+                for n in range(1, len(rack) + 1):
+                    cells, r, c = [], r0, c0
+                    while len(cells) < n and r < dim and c < dim:
+                        if not game.board.letter_at(r, c): cells.append((r, c))
+                        r, c = r + dr, c + dc
+                    if len(cells) < n: continue
+                    for letters in set(itertools.permutations(rack, n)):
+                        placed = [(r, c, l) for (r, c), l in zip(cells, letters)]
+                        if first and (dim // 2, dim // 2) not in [(r, c) for r, c, _ in placed]: continue
+                        trial = game.copy()
+                        for r, c, l in placed: trial.rack.remove(l); trial.place(r, c, l)
+                        ok, _ = trial.confirm_move()
+                        if ok: found[tuple(sorted(placed))] = trial.scores[game.current_player] - game.scores[game.current_player]
+    return found
+
+
+def test_generate_matches_brute_force(small_dic):
+    rng = random.Random(3)
+    for seed in range(6):
+        game = engine.Game(7, {(1, 1): ("L", 2, None), (3, 3): ("S", 2, None)}, small_dic, seed=seed)
+        for p in (1, 2): game.racks[p] = [rng.choice(WORD_LETTERS) for _ in range(3)]
+        for _ in range(4):
+            moves = game.moves()
+            assert {tuple(placed): pts for pts, placed in moves} == brute_moves(game)
+            assert [pts for pts, _ in moves] == sorted((pts for pts, _ in moves), reverse=True)
+            if not moves: break
+            game.play(moves[rng.randrange(len(moves))][1])
+            game.rack[:] = [rng.choice(WORD_LETTERS) for _ in range(3)]
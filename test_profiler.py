@@ -0,0 +1,50 @@
+import json
+import time
+import profiler
+
+
+def test_json_trace_is_streamed(tmp_path):
+    path = str(tmp_path / "profil.json")
+    prof = profiler.Profiler(path)
+    prof.enable()
+    for _ in range(3):
+        prof.begin(); prof.start(); prof.lap("faza \"x\""); prof.end()
+    assert prof.out.tell() > 0   # próbki są już w pliku, nie w pamięci
+    prof.disable()
+    with open(path, encoding="utf-8") as f: data = json.load(f)
+    assert [name for _, name, _ in data["samples"]] == ["faza \"x\"", profiler.FRAME] * 3
+    assert data["summary"][profiler.FRAME]["n"] == 3
+
+
+def test_csv_trace(tmp_path):
+    path = str(tmp_path / "profil.csv")
+    prof = profiler.Profiler(path)
+    prof.enable(); prof.add("faza", 0.001); prof.disable()
+    with open(path, encoding="utf-8") as f: lines = f.read().splitlines()
+    assert lines[0] == "czas_s,faza,ms" and lines[1].split(",")[1:] == ["faza", "1.0000"]
+
+
+def test_overlay_time_is_outside_frame(tmp_path):
+    prof = profiler.Profiler(str(tmp_path / "profil.csv"))
+    prof.enable()
+    prof.begin(); prof.start()
+    prof.lap("scena")
+    time.sleep(0.05)
+    prof.lap_outside("nakładka")
+    prof.end()
+    frame, overlay = prof.stats(profiler.FRAME)[0], prof.stats("nakładka")[0]
+    assert overlay >= 50 and frame < overlay
+    prof.disable()
+
+
+def test_frame_where_profiler_was_enabled_is_skipped(tmp_path):
+    # Pętla gry: begin() przed obsługą F3, więc w klatce włączenia begin() nic nie robi
+    prof = profiler.Profiler(str(tmp_path / "profil.csv"))
+    for _ in range(2):
+        prof.begin()
+        prof.toggle()
+        prof.start(); prof.lap("scena"); prof.end()
+        assert profiler.FRAME not in prof.samples
+        prof.begin(); prof.start(); prof.lap("scena"); prof.end()
+        assert prof.stats(profiler.FRAME)[4] == 1 and prof.stats(profiler.FRAME)[0] < 1000
+        prof.toggle()
@@ -0,0 +1,45 @@
+import os
+import shutil
+import engine
+import record
+
+
+def recorded_game(path, dic, actions=23):
+    game = engine.Game(15, {}, dic, seed=5)
+    record.GameRecorder(str(path), game, {1: "A", 2: "B"}, snapshot_every=5)
+    for _ in range(actions):
+        best = game.best_move()
+        if best: game.play(best[1])
+        elif not game.exchange(range(len(game.rack))): game.confirm_move()
+    game.recorder.close()
+    return game
+
+
+def same_position(a, b):
+    return (a.state.rows, a.state.racks, a.scores, a.current_player) == (b.state.rows, b.state.racks, b.scores, b.current_player)
+
+
+def test_load_replays_recorded_game(tmp_path, small_dic):
+    game = recorded_game(tmp_path / "gra.scrrec", small_dic)
+    loaded, _, actions = record.load(str(tmp_path / "gra.scrrec"))
+    assert actions == 23 and same_position(loaded, game)
+
+
+def test_torn_tail_is_skipped_and_truncated_on_resume(tmp_path, small_dic):
+    # Po 20 akcjach ostatni rekord to migawka, po 23 - akcja: obcięcie w dowolnym miejscu ostatniego rekordu
+    for actions in (20, 23):
+        src = tmp_path / f"gra{actions}.scrrec"
+        recorded_game(src, small_dic, actions)
+        last = max(offset for _, offset, _ in record.iter_records(str(src)))
+        for end in range(last + 1, os.path.getsize(src)):
+            path = str(tmp_path / "urwana.scrrec")
+            shutil.copy(src, path)
+            with open(path, "r+b") as f: f.truncate(end)
+            _, _, before = record.load(path)
+            assert before == (actions if actions % 5 == 0 else actions - 1)
+            game, _ = record.resume(path, small_dic)
+            assert os.path.getsize(path) == record.complete_end(path)
+            game.confirm_move()
+            game.recorder.close()
+            loaded, _, after = record.load(path)
+            assert after == before + 1 and same_position(loaded, game)
@@ -0,0 +1,107 @@
+import asyncio
+import engine
+import server
+
+HOST = "127.0.0.1"
+
+
+async def open_server(dic):
+    gs = server.GameServer(dic, 15, {(7, 7): ("S", 2, None)}, test_seeds=True)
+    srv = await asyncio.start_server(gs.handle, HOST, 0, limit=server.MAX_LINE)
+    return gs, srv, srv.sockets[0].getsockname()[1]
+
+
+async def paired(port, seed=None):
+    # Dwa połączenia w jednym pokoju; zwraca {miejsce: (połączenie, komunikat "start")}
+    a, b = await server.Connection.open(HOST, port), await server.Connection.open(HOST, port)
+    a.send({"t": "join", "name": "A", "room": "test", "seed": seed})
+    assert (await a.recv())["t"] == "wait"
+    b.send({"t": "join", "name": "B", "room": "test"})
+    seats = {}
+    for conn in (a, b):
+        msg = await conn.recv()
+        assert msg["t"] == "start"
+        seats[msg["you"]] = (conn, msg)
+    return seats
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 120))
+
+
+def test_seeded_game_mirrors_server(small_dic):
+    # Lustra klientów (mirror_game + apply_delta) po każdej akcji zgadzają się z tą samą partią liczoną lokalnie
+    async def scenario():
+        gs, srv, port = await open_server(small_dic)
+        seats = await paired(port, seed=7)
+        local = engine.Game(15, gs.premium_map, small_dic, seed=7)
+        mirrors = {seat: server.mirror_game(msg, small_dic) for seat, (_, msg) in seats.items()}
+        for _ in range(40):
+            p = local.current_player
+            conn, mirror = seats[p][0], mirrors[p]
+            best = mirror.best_move()
+            if best:
+                conn.send({"t": "move", "m": best[1]}); local.play(best[1])
+            else:
+                if len(local.bag) >= engine.RACK_SIZE:
+                    conn.send({"t": "ex", "i": list(range(len(local.rack)))}); local.exchange(range(len(local.rack)))
+                else: conn.send({"t": "pass"}); local.confirm_move()
+            for seat, (c, _) in seats.items():
+                msg = await c.recv()
+                assert msg["t"] == "d" and msg["p"] == p
+                server.apply_delta(mirrors[seat], msg, seat)
+                m = mirrors[seat]
+                assert (m.board.cells, m.scores, m.racks[seat], len(m.bag), m.current_player) == \
+                       (local.board.cells, local.scores, local.racks[seat], len(local.bag), local.current_player)
+            if local.finished: break
+        ended = local.finished
+        if not ended:
+            # Poddanie gracza na ruchu: kary jak na końcu partii, wygrywa przeciwnik
+            seats[local.current_player][0].send({"t": "end"})
+        result = local.end_game()
+        winner = result if ended else 3 - local.current_player
+        for c, _ in seats.values():
+            msg = await c.recv()
+            assert msg["t"] == "end" and msg["s"] == [local.scores[1], local.scores[2]] and msg["w"] == winner
+        assert not gs.rooms
+        for c, _ in seats.values(): c.close()
+        srv.close()
+    run(scenario())
+
+
+def test_malformed_messages_keep_connection(small_dic):
+    bad = [b"nie json", b"[1]", b"5", b'{"x": 1}', b'{"t": "nieznany"}', b'{"t": "join"}',
+           b'{"t": "ex", "i": [{"a": 1}]}', b'{"t": "ex", "i": [0, 0]}', b'{"t": "ex", "i": [99]}', b'{"t": "ex", "i": "ab"}',
+           b'{"t": "ex", "i": [true]}', b'{"t": "move", "m": "AB"}', b'{"t": "move", "m": [[0, 0, {"x": 1}]]}',
+           b'{"t": "move", "m": [[true, 0, "A"]]}', b'{"t": "move", "m": [[0, 0]]}', b'{"t": "move", "m": [[99, 0, "A"]]}']
+
+    async def scenario():
+        gs, srv, port = await open_server(small_dic)
+        seats = await paired(port)
+        turn = seats[1][1]["turn"]
+        on_turn, off_turn = seats[turn][0], seats[3 - turn][0]
+        for line in bad:
+            on_turn.writer.write(line + b"\n")
+            assert (await on_turn.recv())["t"] == "err", line
+        off_turn.send({"t": "pass"})
+        assert (await off_turn.recv())["msg"] == "Nie twoja kolej"
+        on_turn.send({"t": "stats"})
+        stats = await on_turn.recv()
+        assert stats["games"] == 1 and stats["conns"] == 2
+        # Zakończenie poza kolejką to poddanie - wygrywa przeciwnik
+        off_turn.send({"t": "end"})
+        for conn in (on_turn, off_turn):
+            msg = await conn.recv()
+            assert msg["t"] == "end" and msg["w"] == turn
+        on_turn.close(); off_turn.close()
+        srv.close()
+    run(scenario())
+
+
+def test_bots_finish_a_game(small_dic):
+    async def scenario():
+        _, srv, port = await open_server(small_dic)
+        await asyncio.gather(server.run_bot(HOST, port, small_dic, "A", "boty", 1),
+                             server.run_bot(HOST, port, small_dic, "B", "boty", 1))
+        srv.close()
+    run(scenario())